@@ -0,0 +1,28 @@
+-- Data quality trend and alert queries over the metrics history.
+-- Both read data_quality_metrics only (indexed on checked_at and
+-- metric_name, checked_at), never the fact table.
+
+-- Alerts: metrics that are not Good in the latest run
+select
+    category,
+    metric_name,
+    metric_value,
+    batch_value,
+    status,
+    checked_at
+from {{ ref('data_quality_metrics') }}
+where checked_at = (select max(checked_at) from {{ ref('data_quality_metrics') }})
+  and status in ('Warning', 'Error')
+order by status desc, category, metric_name;
+
+-- Trend: how each fact metric moved run over run
+select
+    metric_name,
+    checked_at,
+    metric_value,
+    batch_value,
+    metric_value - lag(metric_value) over (partition by metric_name order by checked_at) as change_since_last_run,
+    status
+from {{ ref('data_quality_metrics') }}
+where category in ('Fact Table', 'Referential Integrity')
+order by metric_name, checked_at;
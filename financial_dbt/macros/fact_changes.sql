@@ -0,0 +1,87 @@
+/*
+Change capture for fact_financial_transactions.
+
+The fact table is merged, so a transaction inserted by an earlier run can be
+updated later (new net_sales, profit, units, dimension keys, ...). Running
+totals built over the fact table (data_quality_key_totals) must take the old
+values of such rows out and add the new ones in. capture_fact_changes(),
+a post-hook on the fact model, keeps a trigger on the fact table that copies
+the previous values of every updated or deleted row into
+<fact>_changes. The update trigger only fires when a tracked column actually
+changes, so re-merging identical rows costs no more than evaluating its WHEN
+clause.
+
+The trigger is dropped with the table on --full-refresh and recreated by the
+post-hook. Rows it captured before the rebuild are discarded by the next
+rebaseline of the totals. transaction_id is stored as text, so the changes
+table survives a change of transaction_key_type. The WHEN clause depends on
+the tracked columns: drop the trigger before removing one of them from the
+model.
+*/
+
+{% macro fact_changes_relation(fact) %}
+  {{ return(fact.incorporate(path={'identifier': fact.identifier ~ '_changes'})) }}
+{% endmacro %}
+
+
+{% macro capture_fact_changes() %}
+
+  {%- set changes = fact_changes_relation(this) -%}
+  {%- set trigger_function = this.incorporate(path={'identifier': this.identifier ~ '_capture_changes'}) -%}
+  {%- set tracked = ['date_key', 'product_key', 'segment_key', 'geography_key', 'discount_key',
+                     'units_sold', 'net_sales', 'profit', 'has_missing_keys'] -%}
+
+  create table if not exists {{ changes }} (
+      changed_at timestamptz not null default clock_timestamp(),
+      transaction_id text,
+      first_load_date timestamptz,
+      date_key integer,
+      product_key bigint,
+      segment_key bigint,
+      geography_key bigint,
+      discount_key bigint,
+      units_sold numeric,
+      net_sales numeric,
+      profit numeric,
+      has_missing_keys boolean
+  );
+
+  create or replace function {{ trigger_function }}() returns trigger
+  language plpgsql as $$
+  begin
+      insert into {{ changes }} (transaction_id, first_load_date, {{ tracked | join(', ') }})
+      values (old.transaction_id::text, old.first_load_date, {% for column in tracked %}old.{{ column }}{% if not loop.last %}, {% endif %}{% endfor %});
+      return null;
+  end
+  $$;
+
+  drop trigger if exists capture_updates on {{ this }};
+  create trigger capture_updates
+      after update on {{ this }}
+      for each row
+      when (({% for column in tracked %}old.{{ column }}{% if not loop.last %}, {% endif %}{% endfor %})
+            is distinct from ({% for column in tracked %}new.{{ column }}{% if not loop.last %}, {% endif %}{% endfor %}))
+      execute function {{ trigger_function }}();
+
+  drop trigger if exists capture_deletes on {{ this }};
+  create trigger capture_deletes
+      after delete on {{ this }}
+      for each row
+      execute function {{ trigger_function }}();
+
+{% endmacro %}
+
+
+{% macro prune_fact_changes(fact, totals) %}
+
+  {#- Drop the changes the totals have consumed -#}
+  {%- set changes = adapter.get_relation(database=fact.database, schema=fact.schema,
+                                         identifier=fact_changes_relation(fact).identifier) -%}
+  {%- if changes is none -%}
+    {{ return('') }}
+  {%- endif -%}
+
+  delete from {{ changes }}
+  where changed_at <= (select max(changes_watermark) from {{ totals }})
+
+{% endmacro %}
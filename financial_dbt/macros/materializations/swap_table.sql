@@ -0,0 +1,156 @@
+/*
+Blue/green table materialization for PostgreSQL.
+
+The model is built into a shadow table (<model>__dbt_shadow), indexed and
+analyzed there while readers keep using the live table. The shadow is then
+swapped in with two renames inside one short transaction, so BI queries only
+ever see a complete, indexed table. A failed build never touches the live
+table. The previous copy is renamed to <model>__dbt_old_<run timestamp> and
+dropped later by the drop_swapped_tables() on-run-end hook, outside the
+model's critical path. The timestamp makes every old copy's name unique, so
+a copy that could not be dropped yet (still being read, or a view outside
+dbt depends on it) never stands in the way of the next swap.
+
+The renames need an ACCESS EXCLUSIVE lock. While the swap waits for it
+behind a long BI query, new readers of the table queue behind the swap, so
+each attempt waits only briefly (swap_lock_timeout) and then backs off,
+letting the queued readers through, before retrying.
+
+Config:
+  indexes             - same format as the built-in postgres `indexes` config
+  swap_lock_timeout   - how long one swap attempt may wait for readers (default '200ms')
+  swap_retries        - swap attempts before the model fails (default 5)
+  swap_retry_backoff  - seconds to wait after the first failed attempt, doubled
+                        after each further one (default 0.5)
+*/
+
+{% materialization swap_table, adapter='postgres' %}
+
+  {%- set existing_relation = load_cached_relation(this) -%}
+  {%- set target_relation = this.incorporate(type='table') -%}
+  {%- set shadow_relation = make_intermediate_relation(target_relation, suffix='__dbt_shadow') -%}
+  {%- set preexisting_shadow_relation = load_cached_relation(shadow_relation) -%}
+  {%- set old_relation_type = 'table' if existing_relation is none else existing_relation.type -%}
+  {%- set old_suffix = '__dbt_old_' ~ run_started_at.strftime('%Y%m%d%H%M%S') -%}
+  {%- set old_relation = make_backup_relation(target_relation, old_relation_type, suffix=old_suffix) -%}
+  {%- set lock_timeout = config.get('swap_lock_timeout', '200ms') -%}
+  {%- set retries = config.get('swap_retries', 5) -%}
+  {%- set backoff = config.get('swap_retry_backoff', 0.5) -%}
+  {%- set grant_config = config.get('grants') -%}
+
+  -- Leftover shadow from an interrupted run. Old copies are left to the
+  -- on-run-end hook: their names are unique, so they never block the swap.
+  {{ drop_relation_if_exists(preexisting_shadow_relation) }}
+
+  {{ run_hooks(pre_hooks, inside_transaction=False) }}
+  {{ run_hooks(pre_hooks, inside_transaction=True) }}
+
+  -- 1. Build, index and analyze the shadow copy. The live table is not locked.
+  {% call statement('main') -%}
+    {{ get_create_table_as_sql(False, shadow_relation, sql) }}
+  {%- endcall %}
+
+  {% do create_indexes(shadow_relation) %}
+
+  {% call statement('analyze_shadow') -%}
+    analyze {{ shadow_relation }}
+  {%- endcall %}
+
+  {{ adapter.commit() }}
+
+  -- 2. Swap. The exclusive lock on the live table is held only for the renames.
+  --    A failed attempt rolls back its subtransaction, releasing its lock
+  --    request, and sleeps before the next one.
+  {% call statement('swap_lock_timeout') -%}
+    set local lock_timeout = '{{ lock_timeout }}'
+  {%- endcall %}
+
+  {% call statement('swap') -%}
+    do $$
+    declare
+        attempt integer := 1;
+    begin
+        loop
+            begin
+                {% if existing_relation is not none -%}
+                alter table {{ existing_relation }} rename to {{ adapter.quote(old_relation.identifier) }};
+                {% endif -%}
+                alter table {{ shadow_relation }} rename to {{ adapter.quote(target_relation.identifier) }};
+                exit;
+            exception when lock_not_available then
+                if attempt >= {{ retries }} then
+                    raise;
+                end if;
+                raise notice 'Swap of {{ target_relation }} waiting for readers (attempt % of {{ retries }})', attempt;
+                perform pg_sleep({{ backoff }} * power(2, attempt - 1));
+                attempt := attempt + 1;
+            end;
+        end loop;
+    end
+    $$
+  {%- endcall %}
+
+  {% if existing_relation is not none %}
+    {% do adapter.cache_renamed(existing_relation, old_relation) %}
+  {% endif %}
+  {% do adapter.cache_renamed(shadow_relation, target_relation) %}
+
+  {% set should_revoke = should_revoke(existing_relation, full_refresh_mode=True) %}
+  {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke) %}
+  {% do persist_docs(target_relation, model) %}
+
+  {{ run_hooks(post_hooks, inside_transaction=True) }}
+
+  {{ adapter.commit() }}
+
+  -- 3. Old tables are dropped by the on-run-end hook. Views hold no data and
+  --    are cheap to drop, so they go straight away (e.g. view -> table switch).
+  {% if existing_relation is not none and existing_relation.type != 'table' %}
+    {{ adapter.drop_relation(old_relation) }}
+  {% endif %}
+
+  {{ run_hooks(post_hooks, inside_transaction=False) }}
+
+  {{ return({'relations': [target_relation]}) }}
+
+{% endmaterialization %}
+
+
+/*
+Drops the <model>__dbt_old_<timestamp> tables left behind by swap_table.
+
+Runs once per invocation from on-run-end. Each drop waits at most
+`lock_timeout` for readers still scanning the old copy and never cascades.
+Tables that cannot be dropped yet (still in use, or a view outside dbt still
+depends on them) are skipped with a notice and picked up by the next run
+instead of failing or blocking it.
+*/
+{% macro drop_swapped_tables(schemas, lock_timeout='2s') %}
+
+  {% if schemas | length == 0 %}
+    {{ return('') }}
+  {% endif %}
+
+  begin;
+  set local lock_timeout = '{{ lock_timeout }}';
+  do $$
+  declare
+      old_table record;
+  begin
+      for old_table in
+          select schemaname, tablename
+          from pg_tables
+          where schemaname in ({% for schema in schemas %}'{{ schema }}'{% if not loop.last %}, {% endif %}{% endfor %})
+            and tablename like '%\_\_dbt\_old%'
+      loop
+          begin
+              execute format('drop table if exists %I.%I', old_table.schemaname, old_table.tablename);
+          exception when others then
+              raise notice 'Skipping %.%: %', old_table.schemaname, old_table.tablename, sqlerrm;
+          end;
+      end loop;
+  end
+  $$;
+  commit;
+
+{% endmacro %}
@@ -0,0 +1,46 @@
+/*
+Surrogate key for fact_financial_transactions.
+
+The key is the md5 hash dbt_utils.generate_surrogate_key builds over the
+given columns, stored in the format chosen by the `transaction_key_type` var:
+
+  md5     - 32-character text (default, original format)
+  uuid    - the same 128-bit hash as a 16-byte uuid
+  bigint  - the first 64 bits of the hash as an 8-byte integer
+
+uuid and bigint make the fact table, its unique index and the incremental
+merge lookups smaller. A 64-bit key has roughly a 1 in 15,000 chance of a
+collision at 50 million rows. On its own, a merge on unique_key would treat
+a new transaction whose key collides with an existing one as an update and
+silently overwrite it. The fact model therefore also matches on
+transaction_date and units_sold (incremental_predicates). Both are hash
+inputs, so a genuine re-merge always matches. A colliding row does not match,
+is inserted, and fails the build on the unique index. A collision between
+transactions with the same date and units would still go unnoticed. Changing
+the type requires `dbt run --full-refresh`.
+*/
+
+{% macro transaction_key(columns) %}
+
+  {%- set key_type = var('transaction_key_type', 'md5') -%}
+  {%- set md5_key = dbt_utils.generate_surrogate_key(columns) -%}
+
+  {%- if key_type == 'md5' -%}
+    {{ md5_key }}
+  {%- elif key_type == 'uuid' -%}
+    cast({{ md5_key }} as uuid)
+  {%- elif key_type == 'bigint' -%}
+    cast(cast('x' || substr({{ md5_key }}, 1, 16) as bit(64)) as bigint)
+  {%- else -%}
+    {{ exceptions.raise_compiler_error("Invalid transaction_key_type '" ~ key_type ~ "'. Expected one of: md5, uuid, bigint") }}
+  {%- endif -%}
+
+{% endmacro %}
+
+
+{% macro transaction_key_sql_type() %}
+
+  {%- set key_type = var('transaction_key_type', 'md5') -%}
+  {{ return({'md5': 'text', 'uuid': 'uuid', 'bigint': 'bigint'}.get(key_type, 'text')) }}
+
+{% endmacro %}
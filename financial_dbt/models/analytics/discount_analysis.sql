@@ -1,6 +1,7 @@
 {{
   config(
-    materialized = 'table'
+    materialized = 'swap_table',
+    indexes = [{'columns': ['discount_effectiveness', 'total_profit']}]
   )
 }}
 
@@ -18,7 +19,7 @@ with discount_metrics as (
         sum(f.cogs) as total_cogs,
         sum(f.profit) as total_profit,
         sum(f.units_sold) as units_sold,
-        count(distinct f.transaction_id) as transaction_count
+        count(f.transaction_id) as transaction_count
     from {{ ref('fact_financial_transactions') }} f
     join {{ ref('dim_discount') }} disc on f.discount_key = disc.discount_key
     join {{ ref('dim_product') }} p on f.product_key = p.product_key
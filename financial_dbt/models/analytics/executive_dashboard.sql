@@ -1,6 +1,7 @@
 {{
   config(
-    materialized = 'table'
+    materialized = 'swap_table',
+    indexes = [{'columns': ['metric_category', 'profit']}]
   )
 }}
 
@@ -15,7 +16,7 @@ with company_performance as (
         sum(f.cogs) as total_cogs,
         sum(f.profit) as total_profit,
         sum(f.units_sold) as units_sold,
-        count(distinct f.transaction_id) as transaction_count,
+        count(f.transaction_id) as transaction_count,
         round(100.0 * sum(f.discounts) / nullif(sum(f.gross_sales), 0), 2) as discount_pct,
         round(100.0 * sum(f.profit) / nullif(sum(f.net_sales), 0), 2) as profit_margin_pct
     from {{ ref('fact_financial_transactions') }} f
@@ -1,6 +1,7 @@
 {{
   config(
-    materialized = 'table'
+    materialized = 'swap_table',
+    indexes = [{'columns': ['region', 'country_name']}]
   )
 }}
 
@@ -16,7 +17,7 @@ with geo_metrics as (
         sum(f.cogs) as total_cogs,
         sum(f.profit) as total_profit,
         sum(f.units_sold) as units_sold,
-        count(distinct f.transaction_id) as transaction_count
+        count(f.transaction_id) as transaction_count
     from {{ ref('fact_financial_transactions') }} f
     join {{ ref('dim_geography') }} g on f.geography_key = g.geography_key
     join {{ ref('dim_date') }} d on f.date_key = d.date_key
@@ -1,6 +1,7 @@
 {{
   config(
-    materialized = 'table'
+    materialized = 'swap_table',
+    indexes = [{'columns': ['year', 'month_number']}]
   )
 }}
 
@@ -14,7 +15,7 @@ with monthly_sales as (
         sum(f.net_sales) as net_sales,
         sum(f.cogs) as total_cogs,
         sum(f.profit) as total_profit,
-        count(distinct f.transaction_id) as transaction_count,
+        count(f.transaction_id) as transaction_count,
         sum(f.units_sold) as units_sold
     from {{ ref('fact_financial_transactions') }} f
     join {{ ref('dim_date') }} d on f.date_key = d.date_key
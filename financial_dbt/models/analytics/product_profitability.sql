@@ -1,6 +1,10 @@
 {{
   config(
-    materialized = 'table'
+    materialized = 'swap_table',
+    indexes = [
+      {'columns': ['profit_margin_pct']},
+      {'columns': ['total_profit']}
+    ]
   )
 }}
 
@@ -15,7 +19,7 @@ with product_metrics as (
         sum(f.cogs) as total_cogs,
         sum(f.profit) as total_profit,
         sum(f.units_sold) as units_sold,
-        count(distinct f.transaction_id) as transaction_count
+        count(f.transaction_id) as transaction_count
     from {{ ref('fact_financial_transactions') }} f
     join {{ ref('dim_product') }} p on f.product_key = p.product_key
     where f.has_missing_keys = false  -- Exclude records with data quality issues
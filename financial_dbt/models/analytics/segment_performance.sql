@@ -1,6 +1,7 @@
 {{
   config(
-    materialized = 'table'
+    materialized = 'swap_table',
+    indexes = [{'columns': ['segment_key', 'year', 'quarter']}]
   )
 }}
 
@@ -16,7 +17,7 @@ with segment_metrics as (
         sum(f.cogs) as total_cogs,
         sum(f.profit) as total_profit,
         sum(f.units_sold) as units_sold,
-        count(distinct f.transaction_id) as transaction_count
+        count(f.transaction_id) as transaction_count
     from {{ ref('fact_financial_transactions') }} f
     join {{ ref('dim_segment') }} s on f.segment_key = s.segment_key
     join {{ ref('dim_date') }} d on f.date_key = d.date_key
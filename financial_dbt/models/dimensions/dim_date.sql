@@ -1,3 +1,10 @@
+{{
+  config(
+    materialized = 'swap_table',
+    indexes = [{'columns': ['date_day'], 'unique': True}]
+  )
+}}
+
 -- Use a wider date range to ensure all transaction dates are covered
 with date_spine as (
     {{ dbt_utils.date_spine(
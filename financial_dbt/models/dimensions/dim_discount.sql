@@ -1,3 +1,10 @@
+{{
+  config(
+    materialized = 'swap_table',
+    indexes = [{'columns': ['discount_band']}]
+  )
+}}
+
 with source as (
     select distinct
         discount_band
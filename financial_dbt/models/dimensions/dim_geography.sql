@@ -1,3 +1,13 @@
+{{
+  config(
+    materialized = 'swap_table',
+    indexes = [
+      {'columns': ['country_name']},
+      {'columns': ['region']}
+    ]
+  )
+}}
+
 with source as (
     select distinct -- takes unique countries from my data
         country_name
@@ -1,3 +1,10 @@
+{{
+  config(
+    materialized = 'swap_table',
+    indexes = [{'columns': ['product_name', 'is_current']}]
+  )
+}}
+
 with source as (
     select distinct 
         product_name,
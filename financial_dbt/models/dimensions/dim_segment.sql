@@ -1,4 +1,9 @@
-
+{{
+  config(
+    materialized = 'swap_table',
+    indexes = [{'columns': ['segment_name']}]
+  )
+}}
 
 with source as (
     select distinct segment_name -- here we are taking unique segment values and then also handles SCD type 1
@@ -1,9 +1,28 @@
+{#- first_load_date keeps the time a transaction was first inserted (it is
+    excluded from merge updates); the monitoring models use it to find the
+    rows added by each run.
+    The incremental_predicates guard against transaction_id collisions (see
+    macros/transaction_key.sql): a colliding row does not match and fails the
+    merge on the unique index instead of overwriting another transaction.
+    The post-hook keeps the change capture trigger (macros/fact_changes.sql)
+    that records the previous values of updated rows for the running totals
+    in data_quality_key_totals -#}
 {{
   config(
     materialized = 'incremental',
     unique_key = 'transaction_id',
     incremental_strategy = 'merge',
-    on_schema_change = 'sync_all_columns'
+    on_schema_change = 'sync_all_columns',
+    merge_exclude_columns = ['first_load_date'],
+    incremental_predicates = [
+      "DBT_INTERNAL_DEST.transaction_date is not distinct from DBT_INTERNAL_SOURCE.transaction_date",
+      "DBT_INTERNAL_DEST.units_sold is not distinct from DBT_INTERNAL_SOURCE.units_sold"
+    ],
+    indexes = [
+      {'columns': ['transaction_id'], 'unique': True},
+      {'columns': ['first_load_date']}
+    ],
+    post_hook = "{{ capture_fact_changes() }}"
   )
 }}
 
@@ -19,8 +38,8 @@ with stg_financials as (
 -- Get dimension keys by joining with dimension tables
 with_keys as (
     select
-        -- Surrogate key generation for transaction
-        {{ dbt_utils.generate_surrogate_key(['stg.transaction_date', 'stg.product_name', 'stg.segment_name', 'stg.country_name', 'stg.discount_band', 'stg.units_sold']) }} as transaction_id,
+        -- Surrogate key generation for transaction (type set by the transaction_key_type var)
+        {{ transaction_key(['stg.transaction_date', 'stg.product_name', 'stg.segment_name', 'stg.country_name', 'stg.discount_band', 'stg.units_sold']) }} as transaction_id,
         
         -- Join with dimension tables to get keys
         dd.date_key,
@@ -85,6 +104,7 @@ validate_keys as (
         profit,
         transaction_date,
         load_datetime as load_date,
+        load_datetime as first_load_date,
         record_source,
         -- Flag any records with missing dimension keys for monitoring
         case when date_key is null or product_key is null or segment_key is null 
@@ -109,6 +129,7 @@ select
     profit,
     transaction_date,
     load_date,
+    first_load_date,
     record_source,
     has_missing_keys
 from validate_keys
\ No newline at end of file
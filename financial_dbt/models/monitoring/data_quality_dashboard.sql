@@ -0,0 +1,38 @@
+{{
+  config(
+    materialized = 'view'
+  )
+}}
+
+-- Data quality dashboard: the latest run of data_quality_metrics.
+-- Reads only the newest rows of the history table, so it returns instantly.
+with latest_run as (
+    select *
+    from {{ ref('data_quality_metrics') }}
+    where checked_at = (select max(checked_at) from {{ ref('data_quality_metrics') }})
+)
+
+select
+    category,
+    metric_name,
+    metric_value::text as metric_value,
+    metric_type,
+    status,
+    case
+        when status = 'Good' then '✅'
+        when status = 'Warning' then '⚠️'
+        when status = 'Error' then '❌'
+        else '❓'
+    end as status_icon,
+    checked_at
+from latest_run
+where category <> 'Fact Totals'
+order by
+    case
+        when category = 'Dimension Tables' then 1
+        when category = 'Fact Table' then 2
+        when category = 'Referential Integrity' then 3
+        when category = 'Analytical Consistency' then 4
+        else 5
+    end,
+    metric_name
@@ -0,0 +1,169 @@
+{{
+  config(
+    materialized = 'incremental',
+    unique_key = ['dimension_name', 'key_value'],
+    incremental_strategy = 'merge',
+    indexes = [
+      {'columns': ['dimension_name', 'key_value'], 'unique': True}
+    ],
+    post_hook = "{{ prune_fact_changes(ref('fact_financial_transactions'), this) }}"
+  )
+}}
+
+/*
+Running totals of fact_financial_transactions per dimension key - one row
+per (dimension_name, key_value), key_value -1 standing for a missing key.
+Every dimension partitions the whole fact table, so the rows of any one
+dimension add up to the fact totals. data_quality_metrics reads the fact
+totals and the orphaned references from here instead of scanning the fact
+table.
+
+Each run adds its deltas to the stored totals:
+  - transactions inserted since the previous run (first_load_date after the
+    watermark, an index range scan) are added;
+  - transactions updated or deleted since the previous run are read from
+    the change capture table (macros/fact_changes.sql). The values they had
+    before their first change since then are subtracted and their current
+    values are added.
+Only the keys touched by the deltas are merged.
+
+The totals are rebuilt from a full scan on the first run, when the fact
+table has been rebuilt (all first_load_dates are newer than the watermark)
+or when there is no change capture table yet. Keys that disappeared are
+then set to zero.
+*/
+
+{%- set fact = ref('fact_financial_transactions') -%}
+{%- set changes = fact_changes_relation(fact) -%}
+{%- set columns = ['date_key', 'product_key', 'segment_key', 'geography_key', 'discount_key',
+                   'has_missing_keys', 'units_sold', 'net_sales', 'profit'] -%}
+{%- set measures = ['row_count', 'null_key_count', 'records_with_missing_keys', 'negative_sales_count',
+                    'negative_profit_count', 'inconsistent_units_count', 'net_sales', 'profit'] -%}
+{%- set watermark = none -%}
+{%- set changes_watermark = none -%}
+{%- set new_watermark = none -%}
+{%- set new_changes_watermark = none -%}
+{%- set is_baseline = true -%}
+
+{%- if execute -%}
+    {%- set has_changes = adapter.get_relation(
+        database=changes.database, schema=changes.schema, identifier=changes.identifier
+    ) is not none -%}
+    {%- set latest = run_query(
+        "select (select max(first_load_date)::text from " ~ fact ~ "), "
+        ~ ("(select max(changed_at)::text from " ~ changes ~ ")" if has_changes else "null::text")
+    ) -%}
+    {%- set new_watermark = latest.columns[0].values()[0] -%}
+    {%- set new_changes_watermark = latest.columns[1].values()[0] -%}
+
+    {%- if is_incremental() -%}
+        {%- set state = run_query(
+            "select max(watermark)::text, max(changes_watermark)::text, "
+            ~ "(select min(first_load_date) from " ~ fact ~ ") > max(watermark) as fact_rebuilt "
+            ~ "from " ~ this
+        ) -%}
+        {%- set watermark = state.columns[0].values()[0] -%}
+        {%- set changes_watermark = state.columns[1].values()[0] -%}
+        {%- set is_baseline = watermark is none or new_watermark is none
+                              or state.columns[2].values()[0] or not has_changes -%}
+    {%- endif -%}
+{%- endif -%}
+
+{%- set recorded_changes_watermark = new_changes_watermark if new_changes_watermark is not none else changes_watermark %}
+
+with
+{% if is_baseline %}
+contributions as (
+    select 1 as sign, f.transaction_id is null as null_key, f.{{ columns | join(', f.') }}
+    from {{ fact }} f
+),
+{% else %}
+-- The first capture of each transaction changed since the previous run holds
+-- the values the stored totals were built from
+changed as (
+    {% if new_changes_watermark is not none %}
+    select distinct on (c.transaction_id) c.*
+    from {{ changes }} c
+    where c.changed_at <= '{{ new_changes_watermark }}'
+      {% if changes_watermark is not none -%}
+      and c.changed_at > '{{ changes_watermark }}'
+      {%- endif %}
+      and c.first_load_date <= '{{ watermark }}'
+    order by c.transaction_id, c.changed_at
+    {% else %}
+    select * from {{ changes }} where false
+    {% endif %}
+),
+
+contributions as (
+    -- Transactions inserted since the previous run
+    select 1 as sign, f.transaction_id is null as null_key, f.{{ columns | join(', f.') }}
+    from {{ fact }} f
+    where f.first_load_date > '{{ watermark }}'
+      and f.first_load_date <= '{{ new_watermark }}'
+
+    union all
+
+    -- Changed transactions: take out the values the totals hold...
+    select -1, false, c.{{ columns | join(', c.') }}
+    from changed c
+
+    union all
+
+    -- ...and add the current ones (none if the transaction was deleted)
+    select 1, false, f.{{ columns | join(', f.') }}
+    from changed c
+    join {{ fact }} f
+        on f.transaction_id = cast(c.transaction_id as {{ transaction_key_sql_type() }})
+       and f.first_load_date <= '{{ watermark }}'
+),
+{% endif %}
+
+-- One grouping set per dimension; the other keys are null within each set
+deltas as (
+    select
+        case
+            when grouping(date_key) = 0 then 'date'
+            when grouping(product_key) = 0 then 'product'
+            when grouping(segment_key) = 0 then 'segment'
+            when grouping(geography_key) = 0 then 'geography'
+            else 'discount'
+        end as dimension_name,
+        coalesce(date_key, product_key, segment_key, geography_key, discount_key, -1) as key_value,
+        sum(sign) as row_count,
+        coalesce(sum(sign) filter (where null_key), 0) as null_key_count,
+        coalesce(sum(sign) filter (where has_missing_keys = true), 0) as records_with_missing_keys,
+        coalesce(sum(sign) filter (where net_sales < 0), 0) as negative_sales_count,
+        coalesce(sum(sign) filter (where profit < 0), 0) as negative_profit_count,
+        coalesce(sum(sign) filter (where units_sold <= 0 and net_sales > 0), 0) as inconsistent_units_count,
+        coalesce(sum(sign * net_sales), 0) as net_sales,
+        coalesce(sum(sign * profit), 0) as profit
+    from contributions
+    group by grouping sets ((date_key), (product_key), (segment_key), (geography_key), (discount_key))
+)
+
+select
+    {% if not is_incremental() -%}
+    d.*,
+    {%- elif is_baseline -%}
+    coalesce(d.dimension_name, t.dimension_name) as dimension_name,
+    coalesce(d.key_value, t.key_value) as key_value,
+    {% for measure in measures -%}
+    coalesce(d.{{ measure }}, 0) as {{ measure }},
+    {% endfor -%}
+    {%- else -%}
+    d.dimension_name,
+    d.key_value,
+    {% for measure in measures -%}
+    coalesce(t.{{ measure }}, 0) + d.{{ measure }} as {{ measure }},
+    {% endfor -%}
+    {%- endif %}
+    cast({{ "'" ~ new_watermark ~ "'" if new_watermark is not none else 'null' }} as timestamptz) as watermark,
+    cast({{ "'" ~ recorded_changes_watermark ~ "'" if recorded_changes_watermark is not none else 'null' }} as timestamptz) as changes_watermark,
+    current_timestamp as updated_at
+from deltas d
+{% if is_incremental() -%}
+{{ 'full outer' if is_baseline else 'left' }} join {{ this }} t
+    on t.dimension_name = d.dimension_name
+   and t.key_value = d.key_value
+{%- endif %}
@@ -0,0 +1,324 @@
+{{
+  config(
+    materialized = 'incremental',
+    incremental_strategy = 'append',
+    full_refresh = false,
+    indexes = [
+      {'columns': ['checked_at']},
+      {'columns': ['metric_name', 'checked_at']}
+    ]
+  )
+}}
+
+/*
+Data quality metrics history - one row per metric per pipeline run.
+
+The fact table is merged, so rows inserted by earlier runs can be updated
+and the dimensions they reference are rebuilt every run. The whole-table fact
+metrics come from data_quality_key_totals, which keeps running totals per
+dimension key and adds each run's deltas to them: the transactions inserted
+since the previous run plus, for the transactions updated since then, their
+new values minus their old ones (captured by a trigger on the fact table,
+see macros/fact_changes.sql). Orphaned references are the totals of the keys
+missing from the current dimensions, so no metric scans the fact table.
+
+batch_value holds the same metric for just the transactions inserted since
+the previous run (first_load_date > watermark, an index range scan).
+
+The duplicate key count is a running total kept here. transaction_id is the
+merge key and never changes, so a run can only add duplicates among its own
+new rows. It is recounted in full on the first run, or when the fact table
+has been rebuilt (all first_load_dates are newer than the watermark).
+
+Dimensions are rebuilt in full on every run and are small, so their metrics
+are recomputed directly.
+
+full_refresh = false keeps the history when the pipeline runs --full-refresh.
+*/
+
+{%- set fact = ref('fact_financial_transactions') -%}
+{%- set key_totals = ref('data_quality_key_totals') -%}
+{%- set watermark = none -%}
+{%- set is_baseline = true -%}
+
+{%- if is_incremental() and execute -%}
+    {%- set state = run_query(
+        "select max(watermark)::text as watermark, "
+        ~ "(select min(first_load_date) from " ~ fact ~ ") > max(watermark) as fact_rebuilt "
+        ~ "from " ~ this
+    ) -%}
+    {%- set watermark = state.columns[0].values()[0] -%}
+    {%- set is_baseline = watermark is none or state.columns[1].values()[0] -%}
+{%- endif %}
+
+-- Every dimension's key totals add up to the fact totals
+with fact_totals as (
+    select
+        coalesce(sum(row_count), 0) as row_count,
+        coalesce(sum(null_key_count), 0) as null_key_count,
+        coalesce(sum(records_with_missing_keys), 0) as records_with_missing_keys,
+        coalesce(sum(negative_sales_count), 0) as negative_sales_count,
+        coalesce(sum(negative_profit_count), 0) as negative_profit_count,
+        coalesce(sum(inconsistent_units_count), 0) as inconsistent_units_count,
+        coalesce(sum(net_sales), 0) as net_sales,
+        coalesce(sum(profit), 0) as profit,
+        (select max(watermark) from {{ key_totals }}) as watermark
+    from {{ key_totals }}
+    where dimension_name = 'date'
+),
+
+-- Fact rows referencing keys missing from the current dimensions
+orphans as (
+    select
+        coalesce(sum(k.row_count) filter (where k.dimension_name = 'date' and d.date_key is null), 0) as orphaned_dates,
+        coalesce(sum(k.row_count) filter (where k.dimension_name = 'product' and p.product_key is null), 0) as orphaned_products,
+        coalesce(sum(k.row_count) filter (where k.dimension_name = 'segment' and s.segment_key is null), 0) as orphaned_segments,
+        coalesce(sum(k.row_count) filter (where k.dimension_name = 'geography' and g.geography_key is null), 0) as orphaned_geographies,
+        coalesce(sum(k.row_count) filter (where k.dimension_name = 'discount' and disc.discount_key is null), 0) as orphaned_discounts
+    from {{ key_totals }} k
+    left join {{ ref('dim_date') }} d on k.dimension_name = 'date' and k.key_value = d.date_key
+    left join {{ ref('dim_product') }} p on k.dimension_name = 'product' and k.key_value = p.product_key
+    left join {{ ref('dim_segment') }} s on k.dimension_name = 'segment' and k.key_value = s.segment_key
+    left join {{ ref('dim_geography') }} g on k.dimension_name = 'geography' and k.key_value = g.geography_key
+    left join {{ ref('dim_discount') }} disc on k.dimension_name = 'discount' and k.key_value = disc.discount_key
+),
+
+-- The same metrics for this run's new rows (index range scan on first_load_date)
+batch_stats as (
+    select
+        count(*) as row_count,
+        count(*) - count(distinct f.transaction_id) as duplicate_key_count,
+        count(*) filter (where f.transaction_id is null) as null_key_count,
+        count(*) filter (where f.has_missing_keys = true) as records_with_missing_keys,
+        count(*) filter (where f.net_sales < 0) as negative_sales_count,
+        count(*) filter (where f.profit < 0) as negative_profit_count,
+        count(*) filter (where f.units_sold <= 0 and f.net_sales > 0) as inconsistent_units_count,
+        count(*) filter (where d.date_key is null) as orphaned_dates,
+        count(*) filter (where p.product_key is null) as orphaned_products,
+        count(*) filter (where s.segment_key is null) as orphaned_segments,
+        count(*) filter (where g.geography_key is null) as orphaned_geographies,
+        count(*) filter (where disc.discount_key is null) as orphaned_discounts,
+        coalesce(sum(f.net_sales), 0) as net_sales,
+        coalesce(sum(f.profit), 0) as profit
+    from {{ fact }} f
+    left join {{ ref('dim_date') }} d on f.date_key = d.date_key
+    left join {{ ref('dim_product') }} p on f.product_key = p.product_key
+    left join {{ ref('dim_segment') }} s on f.segment_key = s.segment_key
+    left join {{ ref('dim_geography') }} g on f.geography_key = g.geography_key
+    left join {{ ref('dim_discount') }} disc on f.discount_key = disc.discount_key
+    where f.first_load_date <= (select watermark from fact_totals)
+    {% if not is_baseline -%}
+      and f.first_load_date > '{{ watermark }}'
+    {%- endif %}
+),
+
+previous_duplicates as (
+    {% if not is_baseline %}
+    select metric_value as duplicate_key_count
+    from {{ this }}
+    where checked_at = (select max(checked_at) from {{ this }})
+      and metric_name = 'fact_financial_transactions - Duplicate Keys'
+    {% else %}
+    select cast(0 as numeric) as duplicate_key_count
+    {% endif %}
+),
+
+-- check_type drives the status
+fact_metrics as (
+    select 'Fact Table' as category, 'fact_financial_transactions' as metric_name,
+           b.row_count as batch_value, t.row_count as metric_value,
+           'Count' as metric_type, 'non_zero' as check_type
+    from fact_totals t cross join batch_stats b
+    union all
+    select 'Fact Table', 'fact_financial_transactions - Null Keys',
+           b.null_key_count, t.null_key_count, 'Count', 'zero_or_error'
+    from fact_totals t cross join batch_stats b
+    union all
+    select 'Fact Table', 'fact_financial_transactions - Duplicate Keys',
+           b.duplicate_key_count, b.duplicate_key_count + coalesce(p.duplicate_key_count, 0),
+           'Count', 'zero_or_error'
+    from batch_stats b
+    left join previous_duplicates p on true
+    union all
+    select 'Fact Table', 'fact_financial_transactions - Records With Missing Keys',
+           b.records_with_missing_keys, t.records_with_missing_keys, 'Count', 'under_1_pct'
+    from fact_totals t cross join batch_stats b
+    union all
+    select 'Fact Table', 'fact_financial_transactions - Negative Sales',
+           b.negative_sales_count, t.negative_sales_count, 'Count', 'zero_or_warning'
+    from fact_totals t cross join batch_stats b
+    union all
+    select 'Fact Table', 'fact_financial_transactions - Negative Profit',
+           b.negative_profit_count, t.negative_profit_count, 'Count', 'under_5_pct'
+    from fact_totals t cross join batch_stats b
+    union all
+    select 'Fact Table', 'fact_financial_transactions - Inconsistent Units',
+           b.inconsistent_units_count, t.inconsistent_units_count, 'Count', 'zero_or_warning'
+    from fact_totals t cross join batch_stats b
+    union all
+    select 'Referential Integrity', 'date_dimension',
+           b.orphaned_dates, o.orphaned_dates, 'Orphaned Records', 'zero_or_error'
+    from orphans o cross join batch_stats b
+    union all
+    select 'Referential Integrity', 'product_dimension',
+           b.orphaned_products, o.orphaned_products, 'Orphaned Records', 'zero_or_error'
+    from orphans o cross join batch_stats b
+    union all
+    select 'Referential Integrity', 'segment_dimension',
+           b.orphaned_segments, o.orphaned_segments, 'Orphaned Records', 'zero_or_error'
+    from orphans o cross join batch_stats b
+    union all
+    select 'Referential Integrity', 'geography_dimension',
+           b.orphaned_geographies, o.orphaned_geographies, 'Orphaned Records', 'zero_or_error'
+    from orphans o cross join batch_stats b
+    union all
+    select 'Referential Integrity', 'discount_dimension',
+           b.orphaned_discounts, o.orphaned_discounts, 'Orphaned Records', 'zero_or_error'
+    from orphans o cross join batch_stats b
+    union all
+    select 'Fact Totals', 'fact_financial_transactions - Net Sales',
+           b.net_sales, t.net_sales, 'Sum', 'info'
+    from fact_totals t cross join batch_stats b
+    union all
+    select 'Fact Totals', 'fact_financial_transactions - Profit',
+           b.profit, t.profit, 'Sum', 'info'
+    from fact_totals t cross join batch_stats b
+),
+
+-- Dimensions are small and fully rebuilt each run
+dimension_counts as (
+    select
+        'dim_date' as dimension_table,
+        count(*) as row_count,
+        0 as null_key_count,
+        0 as duplicate_key_count
+    from {{ ref('dim_date') }}
+
+    union all
+
+    select
+        'dim_product' as dimension_table,
+        count(*) as row_count,
+        sum(case when product_key is null then 1 else 0 end) as null_key_count,
+        count(*) - count(distinct product_key) as duplicate_key_count
+    from {{ ref('dim_product') }}
+
+    union all
+
+    select
+        'dim_segment' as dimension_table,
+        count(*) as row_count,
+        sum(case when segment_key is null then 1 else 0 end) as null_key_count,
+        count(*) - count(distinct segment_key) as duplicate_key_count
+    from {{ ref('dim_segment') }}
+
+    union all
+
+    select
+        'dim_geography' as dimension_table,
+        count(*) as row_count,
+        sum(case when geography_key is null then 1 else 0 end) as null_key_count,
+        count(*) - count(distinct geography_key) as duplicate_key_count
+    from {{ ref('dim_geography') }}
+
+    union all
+
+    select
+        'dim_discount' as dimension_table,
+        count(*) as row_count,
+        sum(case when discount_key is null then 1 else 0 end) as null_key_count,
+        count(*) - count(distinct discount_key) as duplicate_key_count
+    from {{ ref('dim_discount') }}
+),
+
+dimension_metrics as (
+    select 'Dimension Tables' as category, dimension_table as metric_name,
+           row_count as metric_value, 'Count' as metric_type, 'non_zero' as check_type
+    from dimension_counts
+    union all
+    select 'Dimension Tables', dimension_table || ' - Null Keys',
+           null_key_count, 'Count', 'zero_or_error'
+    from dimension_counts
+    union all
+    select 'Dimension Tables', dimension_table || ' - Duplicate Keys',
+           duplicate_key_count, 'Count', 'zero_or_error'
+    from dimension_counts
+),
+
+-- The analytical models are small aggregates; compare them with the fact totals
+analytical_consistency as (
+    select
+        'Analytical Consistency' as category,
+        'monthly_sales_vs_fact' as metric_name,
+        abs(t.net_sales - (select sum(net_sales) from {{ ref('monthly_sales_analysis') }})) as metric_value,
+        'Difference' as metric_type,
+        'under_1' as check_type
+    from fact_totals t
+
+    union all
+
+    select
+        'Analytical Consistency',
+        'product_profit_vs_fact',
+        abs(t.profit - (select sum(total_profit) from {{ ref('product_profitability') }})),
+        'Difference',
+        'under_1'
+    from fact_totals t
+
+    union all
+
+    select
+        'Analytical Consistency',
+        'segment_sales_vs_fact',
+        abs(t.net_sales - (select sum(net_sales) from {{ ref('segment_performance') }})),
+        'Difference',
+        'under_1'
+    from fact_totals t
+),
+
+combined_results as (
+    select category, metric_name, batch_value, metric_value, metric_type, check_type
+    from fact_metrics
+
+    union all
+
+    select category, metric_name, metric_value as batch_value, metric_value, metric_type, check_type
+    from dimension_metrics
+
+    union all
+
+    select category, metric_name, metric_value as batch_value, metric_value, metric_type, check_type
+    from analytical_consistency
+)
+
+select
+    '{{ invocation_id }}' as run_id,
+    current_timestamp as checked_at,
+    r.category,
+    r.metric_name,
+    cast(r.batch_value as numeric) as batch_value,
+    cast(r.metric_value as numeric) as metric_value,
+    r.metric_type,
+    case r.check_type
+        when 'non_zero' then case when r.metric_value > 0 then 'Good' else 'Error' end
+        when 'zero_or_error' then case when r.metric_value = 0 then 'Good' else 'Error' end
+        when 'zero_or_warning' then case when r.metric_value = 0 then 'Good' else 'Warning' end
+        when 'under_1_pct' then
+            case
+                when r.metric_value = 0 then 'Good'
+                when r.metric_value < t.row_count * 0.01 then 'Warning'
+                else 'Error'
+            end
+        when 'under_5_pct' then
+            case
+                when r.metric_value = 0 then 'Good'
+                when r.metric_value < t.row_count * 0.05 then 'Warning'
+                else 'Error'
+            end
+        when 'under_1' then case when r.metric_value < 1 then 'Good' else 'Error' end
+        else 'Info'
+    end as status,
+    t.watermark,
+    {{ 'true' if is_baseline else 'false' }} as is_baseline
+from combined_results r
+cross join fact_totals t
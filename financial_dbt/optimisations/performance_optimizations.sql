@@ -1,24 +1,9 @@
 -- Performance Optimization Script
 
--- 1. Add indexes to dimension tables
--- Primary key indexes are automatically created, but we'll add indexes for frequently joined columns
-
--- Date dimension - add index on date_day which is used for joining
-CREATE INDEX IF NOT EXISTS idx_dim_date_date_day ON staging.dim_date (date_day);
-
--- Product dimension - add index on product_name for joins and is_current for SCD Type 2 filtering
-CREATE INDEX IF NOT EXISTS idx_dim_product_name ON staging.dim_product (product_name);
-CREATE INDEX IF NOT EXISTS idx_dim_product_current ON staging.dim_product (is_current) WHERE is_current = true;
-
--- Segment dimension - add index on segment_name
-CREATE INDEX IF NOT EXISTS idx_dim_segment_name ON staging.dim_segment (segment_name);
-
--- Geography dimension - add indexes on country_name and region for joins and filtering
-CREATE INDEX IF NOT EXISTS idx_dim_geography_country ON staging.dim_geography (country_name);
-CREATE INDEX IF NOT EXISTS idx_dim_geography_region ON staging.dim_geography (region);
-
--- Discount dimension - add index on discount_band
-CREATE INDEX IF NOT EXISTS idx_dim_discount_band ON staging.dim_discount (discount_band);
+-- 1. Dimension table indexes
+-- Dimensions use the swap_table materialization, which creates their indexes
+-- (see the `indexes` config in each model) on the shadow copy before it is
+-- swapped in. Indexes created here would be lost on the next rebuild.
 
 -- 2. Add indexes to fact table
 -- First, add indexes for foreign keys to improve join performance
@@ -93,40 +78,9 @@ CREATE INDEX ON staging.fact_financial_transactions_y2017 (product_key);
 CREATE INDEX ON staging.fact_financial_transactions_y2018 (product_key);
 */
 
--- 4. Update statistics to help the query planner
+-- 4. Update statistics to help the query planner (dimensions are analyzed by swap_table)
 ANALYZE staging.fact_financial_transactions;
-ANALYZE staging.dim_date;
-ANALYZE staging.dim_product;
-ANALYZE staging.dim_segment;
-ANALYZE staging.dim_geography;
-ANALYZE staging.dim_discount;
-
--- 5. Optimize analytical models for faster querying
--- Add indexes to the analytical models
-
--- Monthly Sales Analysis - index on year and month for time-series queries
-CREATE INDEX IF NOT EXISTS idx_monthly_sales_year_month ON staging.monthly_sales_analysis (year, month_number);
-
--- Product Profitability - index on profitability metrics for ranking queries
-CREATE INDEX IF NOT EXISTS idx_product_profit_margin ON staging.product_profitability (profit_margin_pct DESC);
-CREATE INDEX IF NOT EXISTS idx_product_total_profit ON staging.product_profitability (total_profit DESC);
-
--- Segment Performance - index for filtering and grouping
-CREATE INDEX IF NOT EXISTS idx_segment_performance_segment ON staging.segment_performance (segment_key, year, quarter);
-
--- Geography Performance - index for regional analysis
-CREATE INDEX IF NOT EXISTS idx_geography_region_country ON staging.geography_performance (region, country_name);
-
--- Discount Analysis - index for filtering by effectiveness
-CREATE INDEX IF NOT EXISTS idx_discount_effectiveness ON staging.discount_analysis (discount_effectiveness, total_profit DESC);
-
--- Executive Dashboard - index for filtering by category
-CREATE INDEX IF NOT EXISTS idx_exec_dash_category ON staging.executive_dashboard (metric_category, profit DESC);
 
--- Update statistics on the analytical models
-ANALYZE staging.monthly_sales_analysis;
-ANALYZE staging.product_profitability;
-ANALYZE staging.segment_performance;
-ANALYZE staging.geography_performance;
-ANALYZE staging.discount_analysis;
-ANALYZE staging.executive_dashboard;
\ No newline at end of file
+-- 5. Analytical model indexes and statistics
+-- Like the dimensions, the analytical models are built with swap_table, which
+-- creates their indexes and runs ANALYZE on every rebuild.
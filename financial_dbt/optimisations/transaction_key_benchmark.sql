@@ -0,0 +1,133 @@
+-- Transaction Key Benchmark
+-- Compares the three transaction_key_type formats (md5 text, uuid, bigint) on
+-- table size, unique index size and incremental MERGE time.
+--
+-- Run with psql (PostgreSQL 15+ for MERGE):
+--   psql -d financial_dwh -v rows=10000000 -v batch=500000 -f optimisations/transaction_key_benchmark.sql
+--
+-- Keys are generated with the same expressions as macros/transaction_key.sql,
+-- over synthetic rows shaped like fact_financial_transactions. The tables are
+-- ordinary tables (so they use shared_buffers like the real fact table) in a
+-- scratch schema that is dropped at the end.
+
+\timing on
+
+DROP SCHEMA IF EXISTS transaction_key_bench CASCADE;
+CREATE SCHEMA transaction_key_bench;
+SET search_path = transaction_key_bench;
+
+-- Synthetic source rows: one md5 key per row plus the measures the merge updates
+CREATE TABLE bench_source AS
+SELECT
+    md5(i::text) AS md5_key,
+    (random() * 3000)::numeric(12, 2) AS units_sold,
+    (random() * 500000)::numeric(14, 2) AS net_sales,
+    (random() * 100000)::numeric(14, 2) AS profit
+FROM generate_series(1, :rows) AS i;
+
+-- One target table per key format, each with the unique index the model creates
+CREATE TABLE bench_fact_md5 AS
+SELECT md5_key AS transaction_id, units_sold, net_sales, profit FROM bench_source;
+CREATE UNIQUE INDEX ON bench_fact_md5 (transaction_id);
+
+CREATE TABLE bench_fact_uuid AS
+SELECT cast(md5_key AS uuid) AS transaction_id, units_sold, net_sales, profit FROM bench_source;
+CREATE UNIQUE INDEX ON bench_fact_uuid (transaction_id);
+
+CREATE TABLE bench_fact_bigint AS
+SELECT cast(cast('x' || substr(md5_key, 1, 16) AS bit(64)) AS bigint) AS transaction_id,
+       units_sold, net_sales, profit
+FROM bench_source;
+CREATE UNIQUE INDEX ON bench_fact_bigint (transaction_id);
+
+ANALYZE bench_fact_md5;
+ANALYZE bench_fact_uuid;
+ANALYZE bench_fact_bigint;
+
+-- 1. Table and index size
+SELECT
+    key_type,
+    pg_size_pretty(pg_relation_size(table_name)) AS table_size,
+    pg_size_pretty(pg_indexes_size(table_name)) AS index_size,
+    pg_relation_size(table_name) AS table_bytes,
+    pg_indexes_size(table_name) AS index_bytes
+FROM (VALUES
+    ('md5', 'bench_fact_md5'::regclass),
+    ('uuid', 'bench_fact_uuid'::regclass),
+    ('bigint', 'bench_fact_bigint'::regclass)
+) AS t (key_type, table_name);
+
+-- Warm the cache equally for every format before timing the merges
+SELECT count(*) FROM bench_fact_md5;
+SELECT count(*) FROM bench_fact_uuid;
+SELECT count(*) FROM bench_fact_bigint;
+
+-- 2. Incremental merge: a batch that updates existing rows and inserts new ones
+-- (half of the batch overlaps the existing keys, half is new)
+CREATE TABLE bench_batch AS
+SELECT
+    md5(i::text) AS md5_key,
+    (random() * 3000)::numeric(12, 2) AS units_sold,
+    (random() * 500000)::numeric(14, 2) AS net_sales,
+    (random() * 100000)::numeric(14, 2) AS profit
+FROM generate_series(:rows - :batch / 2 + 1, :rows + :batch / 2) AS i;
+ANALYZE bench_batch;
+
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+MERGE INTO bench_fact_md5 AS f
+USING (SELECT md5_key AS transaction_id, units_sold, net_sales, profit FROM bench_batch) AS b
+    ON f.transaction_id = b.transaction_id
+WHEN MATCHED THEN
+    UPDATE SET units_sold = b.units_sold, net_sales = b.net_sales, profit = b.profit
+WHEN NOT MATCHED THEN
+    INSERT (transaction_id, units_sold, net_sales, profit)
+    VALUES (b.transaction_id, b.units_sold, b.net_sales, b.profit);
+
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+MERGE INTO bench_fact_uuid AS f
+USING (SELECT cast(md5_key AS uuid) AS transaction_id, units_sold, net_sales, profit FROM bench_batch) AS b
+    ON f.transaction_id = b.transaction_id
+WHEN MATCHED THEN
+    UPDATE SET units_sold = b.units_sold, net_sales = b.net_sales, profit = b.profit
+WHEN NOT MATCHED THEN
+    INSERT (transaction_id, units_sold, net_sales, profit)
+    VALUES (b.transaction_id, b.units_sold, b.net_sales, b.profit);
+
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF)
+MERGE INTO bench_fact_bigint AS f
+USING (
+    SELECT cast(cast('x' || substr(md5_key, 1, 16) AS bit(64)) AS bigint) AS transaction_id,
+           units_sold, net_sales, profit
+    FROM bench_batch
+) AS b
+    ON f.transaction_id = b.transaction_id
+WHEN MATCHED THEN
+    UPDATE SET units_sold = b.units_sold, net_sales = b.net_sales, profit = b.profit
+WHEN NOT MATCHED THEN
+    INSERT (transaction_id, units_sold, net_sales, profit)
+    VALUES (b.transaction_id, b.units_sold, b.net_sales, b.profit);
+
+-- Set the visibility map so the count queries below measure the key, not heap fetches
+VACUUM ANALYZE bench_fact_md5;
+VACUUM ANALYZE bench_fact_uuid;
+VACUUM ANALYZE bench_fact_bigint;
+
+-- 3. Sizes after the merge
+SELECT
+    key_type,
+    pg_size_pretty(pg_relation_size(table_name)) AS table_size,
+    pg_size_pretty(pg_indexes_size(table_name)) AS index_size
+FROM (VALUES
+    ('md5', 'bench_fact_md5'::regclass),
+    ('uuid', 'bench_fact_uuid'::regclass),
+    ('bigint', 'bench_fact_bigint'::regclass)
+) AS t (key_type, table_name);
+
+-- 4. count(distinct transaction_id), as the analytical models used before the
+-- unique index, against the plain count(transaction_id) they use now
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT count(DISTINCT transaction_id) FROM bench_fact_md5;
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT count(DISTINCT transaction_id) FROM bench_fact_uuid;
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT count(DISTINCT transaction_id) FROM bench_fact_bigint;
+EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) SELECT count(transaction_id) FROM bench_fact_md5;
+
+DROP SCHEMA transaction_key_bench CASCADE;
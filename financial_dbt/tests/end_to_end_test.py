@@ -8,22 +8,16 @@ import os
 import sys
 import subprocess
 import time
-import logging
 import pandas as pd
 import psycopg2
 from psycopg2 import sql
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('pipeline_test.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# pipeline_logging lives at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from pipeline_logging import setup_logging, set_stage, stream_process_output
 
-logger = logging.getLogger('pipeline_test')
+# Configure logging: JSON lines in a rotating pipeline_test.log, written off the main thread
+logger = setup_logging('pipeline_test', 'pipeline_test.log')
 
 # Database connection parameters - update these with your actual credentials
 DB_PARAMS = {
@@ -52,19 +46,7 @@ def run_command(command, cwd=None):
         )
         
         # Stream output to logs
-        while True:
-            stdout_line = process.stdout.readline()
-            stderr_line = process.stderr.readline()
-            
-            if stdout_line == '' and stderr_line == '' and process.poll() is not None:
-                break
-                
-            if stdout_line:
-                logger.info(stdout_line.strip())
-            if stderr_line:
-                logger.error(stderr_line.strip())
-        
-        retcode = process.poll()
+        retcode = stream_process_output(process, logger)
         success = retcode == 0
         
         if not success:
@@ -380,11 +362,13 @@ def run_all_tests():
     logger.info("Skipping source data test (data is in S3)...")
     
     # Test dbt compilation
+    set_stage('dbt_compile')
     if not test_dbt_compile():
         logger.error("dbt compilation test failed - stopping further tests")
         return False
     
     # Connect to database for data tests
+    set_stage('connect')
     conn = connect_to_db()
     if conn is None:
         logger.error("Database connection failed - stopping further tests")
@@ -395,36 +379,42 @@ def run_all_tests():
     dbt_run_success = True
     
     # Test dbt tests
+    set_stage('dbt_test')
     dbt_tests_pass = test_dbt_test()
     if not dbt_tests_pass:
         logger.warning("Some dbt tests failed - this may indicate data quality issues")
         # Continue with other tests even if dbt tests fail
     
     # Test table counts
+    set_stage('table_counts')
     tables_have_data = test_table_counts(conn)
     if not tables_have_data:
         logger.error("Table count test failed - some tables may be empty")
         # Continue with other tests
     
     # Test referential integrity
+    set_stage('referential_integrity')
     integrity_passes = test_referential_integrity(conn)
     if not integrity_passes:
         logger.error("Referential integrity test failed")
         # Continue with other tests
     
     # Test data quality
+    set_stage('data_quality')
     quality_passes = test_data_quality(conn)
     if not quality_passes:
         logger.warning("Data quality test found issues")
         # Continue with other tests
     
     # Test analytical models
+    set_stage('analytical_models')
     analytical_models_pass = test_analytical_models(conn)
     if not analytical_models_pass:
         logger.error("Analytical models consistency test failed")
         # Continue with other tests
     
     # Close database connection
+    set_stage('complete')
     conn.close()
     
     # Calculate test duration
@@ -1,8 +1,35 @@
+import sys
+import logging
+import argparse
+
 import pandas as pd
 from sqlalchemy import create_engine
 
-# Load the cleaned data
-df = pd.read_csv('financials_cleaned.csv')
+from validate_financials import (
+    CHUNK_SIZE, RAW_SCHEMA, RAW_TABLE, QUARANTINE_TABLE, REASON_CODES,
+    DEFAULT_DATE_FORMAT, MAX_QUARANTINE_RATE,
+    to_number, parse_dates, validate_csv, quarantine_writer, quarantine_rate, log_summary
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger('load_raw_data')
+
+parser = argparse.ArgumentParser(description="Validate and load raw financial data into PostgreSQL")
+parser.add_argument("csv_path", nargs='?', default='Financials.csv', help="CSV file to load (default: %(default)s)")
+parser.add_argument("--append", action="store_true", help="Append to raw.raw_financials instead of replacing it")
+parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows validated and loaded per chunk")
+parser.add_argument("--date-format", default=DEFAULT_DATE_FORMAT,
+                    help="strptime format of the Date column (default: %(default)s)")
+parser.add_argument("--allow", action="append", default=[], choices=REASON_CODES,
+                    help="Reason code to report without quarantining (repeatable)")
+parser.add_argument("--max-quarantine-rate", type=float, default=MAX_QUARANTINE_RATE,
+                    help="Reject the whole load if more than this share of rows is quarantined")
+args = parser.parse_args()
 
 # Connect to PostgreSQL
 db_user = 'postgres'  # Update with your username
@@ -12,7 +39,61 @@ db_name = 'financial_dwh'
 
 engine = create_engine(f'postgresql://{db_user}:{db_password}@{db_host}/{db_name}')
 
-# Create raw table in PostgreSQL
-df.to_sql('raw_financials', engine, schema='raw', if_exists='replace', index=False)
-print("Data loaded to PostgreSQL raw.raw_financials table")
 
+class QuarantineRateExceeded(Exception):
+    pass
+
+
+def valid_row_loader(connection):
+    """
+    Return an on_valid callback that writes validated chunks to the raw table,
+    replacing it on the first chunk unless appending
+    """
+    loaded = []
+
+    def load(chunk_number, rows):
+        # Keep numeric columns numeric in the raw table; amounts are already
+        # known to parse, since failing rows were quarantined
+        rows = rows.copy()
+        for column in ['Units Sold', 'Manufacturing Price', 'Sale Price', 'Gross Sales',
+                       'Discounts', 'Sales', 'COGS', 'Profit']:
+            rows[column] = to_number(rows[column])
+        for column in ['Month Number', 'Year']:
+            rows[column] = to_number(rows[column]).astype('Int64')
+        # Store real dates so the staging cast does not depend on DateStyle
+        rows['Date'] = parse_dates(rows['Date'].str.strip(), args.date_format).dt.date
+
+        if_exists = 'append' if args.append or loaded else 'replace'
+        rows.to_sql(RAW_TABLE, connection, schema=RAW_SCHEMA, if_exists=if_exists, index=False)
+        loaded.append(chunk_number)
+
+    return load
+
+
+# Validate and load the data chunk by chunk in one transaction, so a rejected
+# load leaves the raw and quarantine tables as they were
+try:
+    with engine.begin() as connection:
+        totals = validate_csv(
+            args.csv_path,
+            chunk_size=args.chunk_size,
+            date_format=args.date_format,
+            allowed_reasons=args.allow,
+            on_valid=valid_row_loader(connection),
+            on_quarantine=quarantine_writer(connection, args.csv_path)
+        )
+        log_summary(totals)
+
+        rate = quarantine_rate(totals)
+        if rate > args.max_quarantine_rate:
+            raise QuarantineRateExceeded(
+                f"{totals['quarantined']} of {totals['rows']} rows ({rate:.1%}) failed validation, "
+                f"above the {args.max_quarantine_rate:.1%} limit - check the file and --date-format"
+            )
+except QuarantineRateExceeded as e:
+    logger.error(f"Load rejected, {RAW_SCHEMA}.{RAW_TABLE} left unchanged: {e}")
+    sys.exit(1)
+
+print(f"Data loaded to PostgreSQL {RAW_SCHEMA}.{RAW_TABLE} table")
+if totals['quarantined']:
+    print(f"{totals['quarantined']} rows quarantined in {RAW_SCHEMA}.{QUARANTINE_TABLE}")
@@ -0,0 +1,351 @@
+"""
+Logging and notifications for the pipeline and test runners
+Log calls only put the record on an in-memory queue; a QueueListener thread
+does the formatting and file I/O, so a slow disk never holds up pipeline
+work. Log files are JSON lines tagged with a run id and the current stage,
+with tracebacks in their own exception field, and rotate by size and by day
+with gzip compression.
+
+Notifications are sent by a background thread that batches messages and
+sends them with a timeout, so a slow SMTP server never stalls the pipeline.
+
+Usage:
+    logger = setup_logging('financial_pipeline', 'pipeline.log')
+    set_stage('dbt_models')
+    logger.info("Running dbt models")
+    notifier = NotificationDispatcher()
+    notifier.submit("Pipeline failed", "...", recipients=[...])
+"""
+
+import os
+import sys
+import copy
+import gzip
+import json
+import time
+import uuid
+import queue
+import atexit
+import shutil
+import smtplib
+import logging
+import datetime
+import threading
+import logging.handlers
+from email.mime.text import MIMEText
+
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 14
+
+# The current run id and stage, added to every record by RunContextFilter
+_context = {'run_id': None, 'stage': None}
+
+
+def set_stage(stage):
+    """Tag subsequent log records with a pipeline stage (e.g. 'extract_load')"""
+    _context['stage'] = stage
+
+
+def get_run_id():
+    return _context['run_id']
+
+
+class RunContextFilter(logging.Filter):
+    """Adds run_id and stage to each record before it is queued"""
+
+    def filter(self, record):
+        record.run_id = _context['run_id']
+        record.stage = _context['stage']
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'run_id': getattr(record, 'run_id', None),
+            'stage': getattr(record, 'stage', None),
+            'message': record.getMessage()
+        }
+        # Records from the queue carry the traceback already rendered in exc_text
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+# Renders tracebacks before records are queued
+_traceback_formatter = logging.Formatter()
+
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records with the traceback kept apart from the message
+    The stock prepare() folds the traceback into msg and clears exc_info, so
+    the JSON file would lose its exception field. Here the message is merged
+    with its args and the traceback rendered into exc_text on the logging
+    thread, while its frames are still current; exc_info is dropped so
+    queued records do not keep those frames alive.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotates when the file reaches max_bytes or on the first record after
+    midnight, whichever comes first. Rotated files are gzip-compressed
+    (pipeline.log.1.gz, ...). Like TimedRotatingFileHandler, the first
+    rollover time is taken from the file's last write, so a short daily run
+    still starts a new file if the existing one was last written before today.
+    Runs on the QueueListener thread, so compression does not block logging calls.
+    """
+
+    def __init__(self, filename, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.namer = lambda name: name + '.gz'
+        self.rotator = self._compress
+        if os.path.exists(self.baseFilename):
+            self.rollover_at = self._next_midnight(os.path.getmtime(self.baseFilename))
+        else:
+            self.rollover_at = self._next_midnight()
+
+    @staticmethod
+    def _next_midnight(timestamp=None):
+        """The midnight following timestamp (default: now)"""
+        day = datetime.date.fromtimestamp(timestamp if timestamp is not None else time.time())
+        tomorrow = day + datetime.timedelta(days=1)
+        return datetime.datetime.combine(tomorrow, datetime.time()).timestamp()
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, 'rb') as source_file, gzip.open(dest, 'wb') as dest_file:
+            shutil.copyfileobj(source_file, dest_file)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        if time.time() >= self.rollover_at and os.path.exists(self.baseFilename) \
+                and os.path.getsize(self.baseFilename) > 0:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self._next_midnight()
+
+
+def setup_logging(name, log_file, run_id=None, level=logging.INFO,
+                  max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+    """
+    Route all logging through a queue to a rotating JSON log file and a
+    plain-text console handler. Returns the named logger.
+    The listener is stopped (and the queue drained) at interpreter exit.
+    """
+    _context['run_id'] = run_id or datetime.datetime.now().strftime('%Y%m%d%H%M%S-') + uuid.uuid4().hex[:6]
+    set_stage('startup')
+
+    file_handler = SizeAndTimeRotatingFileHandler(log_file, max_bytes, backup_count)
+    file_handler.setFormatter(JsonFormatter())
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - [%(stage)s] %(message)s'
+    ))
+
+    log_queue = queue.Queue(-1)  # unbounded: putting a record never blocks
+    queue_handler = TracebackQueueHandler(log_queue)
+    queue_handler.addFilter(RunContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    return logging.getLogger(name)
+
+
+def smtp_settings_from_env():
+    """SMTP settings from the environment, or None if SMTP_HOST is not set"""
+    if not os.getenv('SMTP_HOST'):
+        return None
+    return {
+        'host': os.getenv('SMTP_HOST'),
+        'port': int(os.getenv('SMTP_PORT', '587')),
+        'user': os.getenv('SMTP_USER'),
+        'password': os.getenv('SMTP_PASSWORD'),
+        'sender': os.getenv('SMTP_SENDER', 'pipeline_alerts@yourcompany.com')
+    }
+
+
+class NotificationDispatcher:
+    """
+    Sends notifications from a background thread
+    Notifications submitted within batch_window seconds of each other are
+    grouped per recipient list and sent as one message. Each send (connect,
+    STARTTLS, login and send together) must finish within timeout seconds.
+    Without SMTP settings (SMTP_HOST etc.), notifications are only logged.
+    At exit, close() waits for the queued sends and logs a warning for any
+    notification that was not sent.
+    """
+
+    def __init__(self, smtp_settings=None, batch_window=5.0, timeout=10.0, logger=None):
+        self.smtp_settings = smtp_settings if smtp_settings is not None else smtp_settings_from_env()
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger('notifications')
+        self._queue = queue.Queue()
+        # Subjects of notifications submitted but not yet sent (or given up on)
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='notification-dispatcher', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, subject, message, recipients):
+        """Queue a notification; returns immediately"""
+        with self._pending_lock:
+            self._pending.append(subject)
+        self._queue.put((subject, message, tuple(recipients)))
+
+    def close(self, timeout=None):
+        """
+        Send pending notifications and stop the dispatcher thread
+        Waits at most timeout seconds; by default, the send timeout for each
+        recipient list still waiting to be sent. Logs a warning for every
+        notification that could not be sent in that time.
+        """
+        if self._thread.is_alive():
+            if timeout is None:
+                with self._pending_lock:
+                    # One send per recipient list at most; +1 for a send already in flight
+                    timeout = self.timeout * (len(self._pending) + 1)
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+        with self._pending_lock:
+            unsent, self._pending = self._pending, []
+        for subject in unsent:
+            self.logger.warning(f"Notification not sent before shutdown: {subject}")
+
+    def _done(self, subjects):
+        with self._pending_lock:
+            for subject in subjects:
+                if subject in self._pending:
+                    self._pending.remove(subject)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            # Collect anything else submitted within the batch window
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        by_recipients = {}
+        for subject, message, recipients in batch:
+            by_recipients.setdefault(recipients, []).append((subject, message))
+
+        for recipients, notifications in by_recipients.items():
+            if len(notifications) == 1:
+                subject, body = notifications[0]
+            else:
+                subject = f"{notifications[0][0]} (+{len(notifications) - 1} more)"
+                body = "\n\n".join(f"{s}\n{'-' * len(s)}\n{m}" for s, m in notifications)
+            try:
+                self._send(subject, body, list(recipients))
+            except Exception as e:
+                self.logger.error(f"Failed to send notification '{subject}': {e}")
+            finally:
+                self._done(s for s, _ in notifications)
+
+    def _send(self, subject, body, recipients):
+        if self.smtp_settings is None:
+            self.logger.info(f"Would send notification: {subject}")
+            self.logger.info(f"Message: {body}")
+            self.logger.info(f"Recipients: {recipients}")
+            return
+
+        settings = self.smtp_settings
+        msg = MIMEText(body, 'plain')
+        msg['From'] = settings['sender']
+        msg['To'] = ", ".join(recipients)
+        msg['Subject'] = subject
+
+        # The socket timeout applies to each blocking call, so it is reset to
+        # the time left before every step to bound the send as a whole
+        deadline = time.monotonic() + self.timeout
+
+        def remaining():
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise TimeoutError(f"SMTP send took longer than {self.timeout} seconds")
+            return left
+
+        with smtplib.SMTP(settings['host'], settings['port'], timeout=remaining()) as server:
+            server.sock.settimeout(remaining())
+            server.starttls()
+            if settings['user']:
+                server.sock.settimeout(remaining())
+                server.login(settings['user'], settings['password'])
+            server.sock.settimeout(remaining())
+            server.send_message(msg)
+        self.logger.info(f"Email notification sent: {subject}")
+
+
+def stream_process_output(process, logger):
+    """
+    Log a subprocess's stdout (info) and stderr (error) line by line
+    stderr is drained on its own thread so a full pipe on either stream can
+    never block the child process. Returns the exit code.
+    """
+    def drain(stream, log):
+        for line in iter(stream.readline, ''):
+            if line.strip():
+                log(line.rstrip())
+        stream.close()
+
+    stderr_thread = threading.Thread(target=drain, args=(process.stderr, logger.error), daemon=True)
+    stderr_thread.start()
+    drain(process.stdout, logger.info)
+    stderr_thread.join()
+    return process.wait()
@@ -0,0 +1,240 @@
+"""
+Mergeable sketches for streaming data profiling
+Each sketch summarises one column in bounded memory, can be updated one
+chunk at a time, and can be merged with a sketch built from another chunk
+(or another worker process). All sketches serialise to plain dicts so that
+saved profiles can be compared or merged later.
+
+- HyperLogLog: approximate distinct count
+- TDigest: approximate quantiles
+- TopK: frequent values (Misra-Gries summary)
+"""
+
+import base64
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def hash_values(series):
+    """Vectorized 64-bit hash of a column's values (stable across processes and runs)"""
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(values):
+    """Vectorized int.bit_length() for a uint64 array"""
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= (np.uint64(1) << np.uint64(shift))
+        values[mask] >>= np.uint64(shift)
+        lengths[mask] += shift
+    lengths[values > 0] += 1
+    return lengths
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter with 2**precision one-byte registers
+    The default precision of 14 uses 16KB and has a standard error of ~0.8%
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, series):
+        """Add the non-null values of a pandas Series"""
+        if series.empty:
+            return
+        hashes = hash_values(series)
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        remainder = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        rank = (64 - self.precision) - _bit_length(remainder).astype(np.int64) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        """Combine with a sketch of the same precision"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """Approximate number of distinct values seen"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Small-range correction (linear counting)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_dict(self):
+        return {
+            'precision': self.precision,
+            'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['precision'])
+        sketch.registers = np.frombuffer(
+            base64.b64decode(data['registers']), dtype=np.uint8
+        ).copy()
+        return sketch
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles
+    Values are kept as weighted centroids, small near the tails and larger
+    near the median, so extreme quantiles stay accurate. compression bounds
+    the number of centroids (roughly compression / 2).
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = None
+        self.max = None
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _scale(self, q):
+        """k1 scale function: maps quantiles to centroid indices"""
+        return self.compression / (2 * math.pi) * np.arcsin(2 * q - 1)
+
+    def _absorb(self, means, weights):
+        """Merge weighted points into the centroids and re-compress"""
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+
+        # Points whose left edge falls in the same unit of k-space share a centroid
+        total = weights.sum()
+        left = (np.cumsum(weights) - weights) / total
+        buckets = np.floor(self._scale(np.clip(left, 0, 1))).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+
+        bucket_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / bucket_weights
+        self.weights = bucket_weights
+
+    def update(self, values):
+        """Add an array of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        low, high = float(values.min()), float(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self._absorb(values, np.ones(values.size))
+
+    def merge(self, other):
+        """Combine with another digest"""
+        if other.weights.size == 0:
+            return self
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._absorb(other.means, other.weights)
+        return self
+
+    def quantile(self, q):
+        """Approximate value at quantile q (0..1), or None if empty"""
+        if self.weights.size == 0:
+            return None
+        if self.weights.size == 1:
+            return float(self.means[0])
+        positions = np.cumsum(self.weights) - self.weights / 2
+        target = q * self.count
+        # Interpolate between centroids, using min/max as the outer anchors
+        xs = np.r_[0.0, positions, self.count]
+        ys = np.r_[self.min, self.means, self.max]
+        return float(np.interp(target, xs, ys))
+
+    def to_dict(self):
+        return {
+            'compression': self.compression,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist(),
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data['compression'])
+        digest.means = np.asarray(data['means'], dtype=np.float64)
+        digest.weights = np.asarray(data['weights'], dtype=np.float64)
+        digest.min = data['min']
+        digest.max = data['max']
+        return digest
+
+
+class TopK:
+    """
+    Misra-Gries frequent-items summary
+    Keeps at most `capacity` counters. Any value occurring more than
+    total / (capacity + 1) times is guaranteed to be kept, and each count is
+    underestimated by at most `error`.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counters = {}
+        self.error = 0
+
+    def _trim(self):
+        if len(self.counters) <= self.capacity:
+            return
+        counts = sorted(self.counters.values(), reverse=True)
+        cutoff = counts[self.capacity]
+        self.error += cutoff
+        self.counters = {
+            value: count - cutoff
+            for value, count in self.counters.items()
+            if count > cutoff
+        }
+
+    def update_counts(self, counts):
+        """Add a mapping (or Series) of value -> count"""
+        for value, count in counts.items():
+            self.counters[value] = self.counters.get(value, 0) + int(count)
+        self._trim()
+
+    def update(self, series):
+        """Add the non-null values of a pandas Series"""
+        self.update_counts(series.value_counts(sort=False))
+
+    def merge(self, other):
+        """Combine with another summary"""
+        self.error += other.error
+        self.update_counts(other.counters)
+        return self
+
+    def top(self, k=10):
+        """The k most frequent values as (value, count) pairs"""
+        return sorted(self.counters.items(), key=lambda item: (-item[1], str(item[0])))[:k]
+
+    def to_dict(self):
+        return {
+            'capacity': self.capacity,
+            'error': self.error,
+            'counters': [[value, count] for value, count in self.top(self.capacity)]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls(data['capacity'])
+        summary.error = data['error']
+        summary.counters = {value: count for value, count in data['counters']}
+        return summary
@@ -8,65 +8,36 @@ including data extraction, loading, and transformation with dbt.
 import os
 import sys
 import time
-import logging
 import subprocess
 import datetime
 import argparse
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('pipeline.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from pipeline_logging import setup_logging, set_stage, NotificationDispatcher, stream_process_output
 
-logger = logging.getLogger('financial_pipeline')
+# Configure logging: JSON lines in a rotating pipeline.log, written off the main thread
+logger = setup_logging('financial_pipeline', 'pipeline.log')
+
+# Notifications are batched and sent in the background
+notifier = NotificationDispatcher(logger=logger)
 
 # Pipeline configuration
 DBT_PROJECT_DIR = os.path.abspath('financial_dbt')
 DATA_DIR = os.path.abspath('data')
 INCREMENTAL_START_DATE = None  # Will be set based on last successful run
+RAW_DATE_FORMAT = '%d/%m/%Y'  # Date format of the raw export (day first)
 
 
 def send_notification(subject, message, recipients=None):
     """
-    Send email notification about pipeline success/failure
-    For demonstration purposes - in practice, configure with your email settings
+    Queue an email notification about pipeline success/failure
+    Sending happens on a background thread with a timeout; set SMTP_HOST,
+    SMTP_PORT, SMTP_USER, SMTP_PASSWORD and SMTP_SENDER to send real emails,
+    otherwise the notification is only logged
     """
     if not recipients:
         recipients = ['edwardkirumira87@gmail.com']  # Default recipient
     
-    logger.info(f"Would send notification: {subject}")
-    logger.info(f"Message: {message}")
-    logger.info(f"Recipients: {recipients}")
-    
-    # Comment out email sending for now to avoid connection errors
-    """
-    sender = "pipeline_alerts@yourcompany.com"
-    
-    msg = MIMEMultipart()
-    msg['From'] = sender
-    msg['To'] = ", ".join(recipients)
-    msg['Subject'] = subject
-    
-    msg.attach(MIMEText(message, 'plain'))
-    
-    try:
-        server = smtplib.SMTP('smtp.yourcompany.com', 587)
-        server.starttls()
-        server.login(sender, "your_password")
-        server.send_message(msg)
-        server.quit()
-        logger.info("Email notification sent successfully")
-    except Exception as e:
-        logger.error(f"Failed to send email notification: {e}")
-    """
+    notifier.submit(subject, message, recipients)
 
 
 def run_command(command, cwd=None):
@@ -86,19 +57,7 @@ def run_command(command, cwd=None):
         )
         
         # Stream output to logs
-        while True:
-            stdout_line = process.stdout.readline()
-            stderr_line = process.stderr.readline()
-            
-            if stdout_line == '' and stderr_line == '' and process.poll() is not None:
-                break
-                
-            if stdout_line:
-                logger.info(stdout_line.strip())
-            if stderr_line:
-                logger.error(stderr_line.strip())
-        
-        retcode = process.poll()
+        retcode = stream_process_output(process, logger)
         if retcode != 0:
             logger.error(f"Command failed with return code {retcode}")
             return False
@@ -111,10 +70,11 @@ def run_command(command, cwd=None):
         return False
 
 
-def extract_load_data():
+def extract_load_data(date_format=RAW_DATE_FORMAT):
     """
     Extract data from source system and load into staging area
     This would typically involve API calls, file downloads, etc.
+    date_format is the strptime format of the raw file's Date column
     """
     logger.info("Starting data extraction and loading")
     
@@ -126,9 +86,13 @@ def extract_load_data():
         logger.error(f"Raw data file not found: {raw_financial_path}")
         return False
     
-    # Example: Copy raw data to PostgreSQL using psql COPY command
-    # Note: In a real scenario, you might use pandas, SQLAlchemy, etc.
-    load_command = f"psql -h localhost -U postgres -d financial_dw -c \"\\COPY raw.raw_financials FROM '{raw_financial_path}' CSV HEADER\""
+    # Validate the file chunk by chunk while loading it; rows that break the
+    # data invariants go to raw.raw_financials_quarantine instead. The load
+    # fails (and nothing is written) if too many rows are quarantined.
+    load_command = (
+        f"\"{sys.executable}\" load_raw_data.py \"{raw_financial_path}\" --append "
+        f"--date-format \"{date_format}\""
+    )
     success = run_command(load_command)
     
     if not success:
@@ -240,15 +204,18 @@ def run_pipeline(args):
     
     try:
         # Step 1: Extract and load data (unless skipped)
+        set_stage('extract_load')
         if not args.skip_extract_load:
-            if not extract_load_data():
+            if not extract_load_data(args.date_format):
                 raise Exception("Data extraction and loading failed")
         
         # Step 2: Determine incremental start date (if needed)
+        set_stage('incremental_date')
         if not args.full_refresh:
             determine_incremental_date()
         
         # Step 3: Run dbt models
+        set_stage('dbt_models')
         # First run dimensions, then facts
         if not run_dbt_models("dim_*", args.full_refresh):
             raise Exception("Dimension models failed")
@@ -256,7 +223,20 @@ def run_pipeline(args):
         if not run_dbt_models("fact_*", args.full_refresh):
             raise Exception("Fact models failed")
         
+        # Rebuild the marts from the new fact data; the data quality metrics
+        # check them against the fact table
+        set_stage('analytics')
+        if not run_dbt_models("path:models/analytics", args.full_refresh):
+            raise Exception("Analytics models failed")
+        
+        # Update the fact running totals and record data quality metrics for
+        # the rows added or changed by this run
+        set_stage('data_quality')
+        if not run_dbt_models("data_quality_key_totals data_quality_metrics data_quality_dashboard"):
+            logger.warning("Data quality metrics failed, but continuing pipeline")
+        
         # Step 4: Run tests
+        set_stage('dbt_tests')
         # In the run_pipeline function
         if not run_dbt_models("staging.dim_*", args.full_refresh):
          raise Exception("Dimension models failed")
@@ -265,11 +245,13 @@ def run_pipeline(args):
          raise Exception("Fact models failed")
         
         # Step 5: Generate documentation (optional)
+        set_stage('docs')
         if args.generate_docs:
             if not run_command("dbt docs generate", cwd=DBT_PROJECT_DIR):
                 logger.warning("Documentation generation failed, but continuing pipeline")
         
         # Calculate duration
+        set_stage('complete')
         duration = time.time() - start_time
         logger.info(f"Pipeline completed successfully in {duration:.2f} seconds")
         
@@ -301,6 +283,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Financial Data Pipeline Orchestration")
     parser.add_argument("--full-refresh", action="store_true", help="Perform full refresh instead of incremental")
     parser.add_argument("--skip-extract-load", action="store_true", help="Skip data extraction and loading step")
+    parser.add_argument("--date-format", default=RAW_DATE_FORMAT,
+                        help="strptime format of the raw file's Date column (default: %(default)s)")
     parser.add_argument("--skip-tests", action="store_true", help="Skip running dbt tests")
     parser.add_argument("--generate-docs", action="store_true", help="Generate dbt documentation")
     
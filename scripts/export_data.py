@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+"""
+Streaming Data Export for the Financial Data Warehouse
+This script exports an analytics mart, a dimension, or a date-bounded slice of
+the fact table to CSV or Parquet without loading the result into memory.
+
+CSV exports use COPY ... TO STDOUT, Parquet exports read through a named
+(server-side) cursor in batches, so client memory stays constant regardless
+of the table size. Fact slices can be split into one file per month and
+exported in parallel.
+"""
+
+import os
+import sys
+import time
+import uuid
+import logging
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2 import extensions
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+logger = logging.getLogger('data_export')
+
+# Database connection parameters
+DB_PARAMS = {
+    'dbname': os.getenv('DB_NAME', 'financial_dwh'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD', '12345'),
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5432')
+}
+
+DB_SCHEMA = 'staging'
+
+FACT_TABLE = 'fact_financial_transactions'
+
+# Tables that can be exported in full
+MARTS = [
+    'monthly_sales_analysis', 'product_profitability', 'segment_performance',
+    'geography_performance', 'discount_analysis', 'executive_dashboard',
+    'dim_date', 'dim_product', 'dim_segment', 'dim_geography', 'dim_discount'
+]
+
+DEFAULT_BATCH_SIZE = 50000
+
+
+def build_query(table, start_date=None, end_date=None):
+    """
+    Build the export query for a table.
+    Fact table exports can be bounded by transaction_date; end_date is inclusive.
+    """
+    query = sql.SQL("SELECT * FROM {}.{}").format(
+        sql.Identifier(DB_SCHEMA), sql.Identifier(table)
+    )
+    conditions = []
+    params = []
+
+    if start_date:
+        conditions.append(sql.SQL("transaction_date >= %s"))
+        params.append(start_date)
+    if end_date:
+        conditions.append(sql.SQL("transaction_date < %s"))
+        params.append(end_date + datetime.timedelta(days=1))
+
+    if conditions:
+        query = query + sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+
+    return query, params
+
+
+def export_csv(conn, query, params, output_path):
+    """
+    Stream a query to a CSV file with COPY ... TO STDOUT
+    Returns the number of rows written
+    """
+    with conn.cursor() as cursor:
+        select = cursor.mogrify(query, params).decode(extensions.encodings[conn.encoding])
+        copy = f"COPY ({select}) TO STDOUT WITH (FORMAT CSV, HEADER)"
+        with open(output_path, 'w', newline='', encoding='utf-8') as output_file:
+            cursor.copy_expert(copy, output_file)
+        return cursor.rowcount
+
+
+NUMERIC_OID = 1700
+MAX_DECIMAL128_PRECISION = 38
+
+
+def _arrow_type(column):
+    """
+    Map a cursor.description column to an Arrow type
+    numeric(p, s) keeps its exact value as decimal128(p, s). Unconstrained
+    numerics (e.g. sum() or round() results) have no fixed scale, so they are
+    written as strings rather than rounded through float.
+    """
+    import pyarrow as pa
+
+    if column.type_code == NUMERIC_OID:
+        if column.precision is not None and column.precision <= MAX_DECIMAL128_PRECISION:
+            return pa.decimal128(column.precision, column.scale or 0)
+        return pa.string()
+
+    type_map = {
+        16: pa.bool_(),                    # bool
+        20: pa.int64(),                    # int8
+        21: pa.int64(),                    # int2
+        23: pa.int64(),                    # int4
+        700: pa.float64(),                 # float4
+        701: pa.float64(),                 # float8
+        1082: pa.date32(),                 # date
+        1114: pa.timestamp('us'),          # timestamp
+        1184: pa.timestamp('us', tz='UTC'),  # timestamptz
+    }
+    return type_map.get(column.type_code, pa.string())
+
+
+def _arrow_array(values, arrow_type):
+    """Build an Arrow array, converting values of string-typed columns (e.g. Decimals) to text"""
+    import pyarrow as pa
+
+    if arrow_type == pa.string():
+        values = [None if value is None else str(value) for value in values]
+    return pa.array(values, type=arrow_type)
+
+
+def export_parquet(conn, query, params, output_path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream a query to a Parquet file through a named server-side cursor,
+    writing one row group per batch.
+    Returns the number of rows written
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+
+    rows_written = 0
+
+    # A named cursor keeps the result set on the server; only batch_size rows
+    # are held in memory at a time
+    with conn.cursor(name=f"export_{uuid.uuid4().hex}") as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(query, params)
+
+        # A named cursor only has a description after the first fetch. The
+        # writer is created even when that fetch is empty, so an empty table
+        # or month still produces a file with the right schema.
+        rows = cursor.fetchmany(batch_size)
+        schema = pa.schema([
+            (column.name, _arrow_type(column))
+            for column in cursor.description
+        ])
+
+        with pq.ParquetWriter(output_path, schema) as writer:
+            while rows:
+                columns = list(zip(*rows))
+                arrays = [
+                    _arrow_array(columns[i], schema.field(i).type)
+                    for i in range(len(schema))
+                ]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                rows_written += len(rows)
+                rows = cursor.fetchmany(batch_size)
+
+    return rows_written
+
+
+def export_table(table, output_path, file_format='csv', start_date=None, end_date=None,
+                 batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Export a single table (or fact slice) to a file using its own connection
+    Returns a (output_path, rows, seconds) tuple
+    """
+    start_time = time.time()
+    query, params = build_query(table, start_date, end_date)
+
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        if file_format == 'parquet':
+            rows = export_parquet(conn, query, params, output_path, batch_size)
+        else:
+            rows = export_csv(conn, query, params, output_path)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return output_path, rows, time.time() - start_time
+
+
+def get_fact_date_range():
+    """Return the (min, max) transaction_date of the fact table"""
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                sql.SQL("SELECT min(transaction_date), max(transaction_date) FROM {}.{}").format(
+                    sql.Identifier(DB_SCHEMA), sql.Identifier(FACT_TABLE)
+                )
+            )
+            return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def month_ranges(start_date, end_date):
+    """
+    Split an inclusive date range into inclusive per-month ranges
+    e.g. 2014-01-15..2014-03-10 -> [(01-15, 01-31), (02-01, 02-28), (03-01, 03-10)]
+    """
+    ranges = []
+    current = start_date
+    while current <= end_date:
+        if current.month == 12:
+            next_month = datetime.date(current.year + 1, 1, 1)
+        else:
+            next_month = datetime.date(current.year, current.month + 1, 1)
+        ranges.append((current, min(end_date, next_month - datetime.timedelta(days=1))))
+        current = next_month
+    return ranges
+
+
+def log_throughput(label, rows, seconds):
+    """Log row count and rows/sec for an export"""
+    rate = rows / seconds if seconds > 0 else 0
+    logger.info(f"{label}: {rows} rows in {seconds:.2f} seconds ({rate:,.0f} rows/sec)")
+
+
+def run_export(args):
+    """
+    Run the requested export, partitioned by month if asked
+    Returns True if successful, False otherwise
+    """
+    start_time = time.time()
+    extension = 'parquet' if args.format == 'parquet' else 'csv'
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    if args.table != FACT_TABLE and (args.start_date or args.end_date or args.partition_by_month):
+        logger.error("Date bounds and month partitioning only apply to the fact table")
+        return False
+
+    # Build the list of (output_path, start_date, end_date) jobs
+    if args.partition_by_month:
+        start_date, end_date = args.start_date, args.end_date
+        if start_date is None or end_date is None:
+            min_date, max_date = get_fact_date_range()
+            if min_date is None:
+                logger.error(f"{DB_SCHEMA}.{FACT_TABLE} is empty - nothing to export")
+                return False
+            start_date = start_date or min_date
+            end_date = end_date or max_date
+
+        jobs = [
+            (os.path.join(args.output_dir, f"{args.table}_{month_start:%Y_%m}.{extension}"),
+             month_start, month_end)
+            for month_start, month_end in month_ranges(start_date, end_date)
+        ]
+    else:
+        suffix = ''
+        if args.start_date or args.end_date:
+            suffix = f"_{args.start_date or 'start'}_{args.end_date or 'end'}"
+        jobs = [
+            (os.path.join(args.output_dir, f"{args.table}{suffix}.{extension}"),
+             args.start_date, args.end_date)
+        ]
+
+    logger.info(f"Exporting {DB_SCHEMA}.{args.table} to {len(jobs)} {args.format} file(s)")
+
+    total_rows = 0
+    failed = False
+
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as executor:
+        futures = {
+            executor.submit(export_table, args.table, output_path, args.format,
+                            job_start, job_end, args.batch_size): output_path
+            for output_path, job_start, job_end in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                output_path, rows, seconds = future.result()
+            except Exception as e:
+                logger.error(f"Export to {futures[future]} failed: {e}")
+                failed = True
+                continue
+            total_rows += rows
+            log_throughput(output_path, rows, seconds)
+
+    log_throughput(f"Total for {args.table}", total_rows, time.time() - start_time)
+    return not failed
+
+
+def parse_date(value):
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream warehouse tables to CSV or Parquet")
+    parser.add_argument("table", choices=MARTS + [FACT_TABLE], help="Table to export")
+    parser.add_argument("--format", choices=['csv', 'parquet'], default='csv', help="Output file format")
+    parser.add_argument("--output-dir", default='exports', help="Directory for the exported files")
+    parser.add_argument("--start-date", type=parse_date, help="First transaction date to export (fact table only)")
+    parser.add_argument("--end-date", type=parse_date, help="Last transaction date to export, inclusive (fact table only)")
+    parser.add_argument("--partition-by-month", action="store_true", help="Write one file per month (fact table only)")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel exports when partitioning by month")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows fetched per batch for Parquet")
+
+    args = parser.parse_args()
+
+    success = run_export(args)
+    sys.exit(0 if success else 1)
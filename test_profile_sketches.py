@@ -0,0 +1,152 @@
+"""
+Tests for the mergeable sketches (profile_sketches.py) and the streaming
+profiler built on them (data_profiler.py)
+A sketch built from several merged chunks must match one built in a single pass.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from profile_sketches import HyperLogLog, TDigest, TopK
+from data_profiler import infer_kinds, normalise_chunk, profile_chunk, DatasetProfile
+
+
+def chunks(series, size):
+    return [series.iloc[start:start + size] for start in range(0, len(series), size)]
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(42)
+    return pd.Series(rng.lognormal(mean=8, sigma=1, size=20000))
+
+
+def test_hyperloglog_merge_matches_single_pass(values):
+    single = HyperLogLog()
+    single.update(values)
+
+    merged = HyperLogLog()
+    for chunk in chunks(values, 3000):
+        part = HyperLogLog()
+        part.update(chunk)
+        merged.merge(part)
+
+    assert np.array_equal(single.registers, merged.registers)
+    assert merged.estimate() == pytest.approx(values.nunique(), rel=0.03)
+
+
+def test_hyperloglog_small_counts_are_exact_enough():
+    sketch = HyperLogLog()
+    sketch.update(pd.Series(['None', 'Low', 'Medium', 'High', 'Low']))
+    assert sketch.estimate() == 4
+
+
+def test_hyperloglog_rejects_different_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(14))
+
+
+def test_tdigest_merge_matches_single_pass(values):
+    single = TDigest()
+    single.update(values.to_numpy())
+
+    merged = TDigest()
+    for chunk in chunks(values, 3000):
+        part = TDigest()
+        part.update(chunk.to_numpy())
+        merged.merge(part)
+
+    assert merged.count == single.count == len(values)
+    assert (merged.min, merged.max) == (single.min, single.max)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        exact = np.quantile(values, q)
+        assert single.quantile(q) == pytest.approx(exact, rel=0.02)
+        assert merged.quantile(q) == pytest.approx(exact, rel=0.02)
+
+
+def test_tdigest_ignores_nans_and_bounds_centroids(values):
+    digest = TDigest(compression=100)
+    digest.update(np.r_[values.to_numpy(), [np.nan] * 10])
+    assert digest.count == len(values)
+    assert digest.weights.size <= 100
+
+
+def test_topk_merge_matches_single_pass():
+    rng = np.random.default_rng(7)
+    heavy = ['Paseo', 'Velo', 'VTT']
+    values = pd.Series(list(rng.choice(heavy, 6000)) + [f'rare-{i}' for i in range(3000)])
+    values = values.sample(frac=1, random_state=1).reset_index(drop=True)
+
+    single = TopK(capacity=20)
+    single.update(values)
+
+    merged = TopK(capacity=20)
+    for chunk in chunks(values, 1000):
+        part = TopK(capacity=20)
+        part.update(chunk)
+        merged.merge(part)
+
+    assert [value for value, _ in single.top(3)] == [value for value, _ in merged.top(3)]
+    assert {value for value, _ in merged.top(3)} == set(heavy)
+    true_counts = values.value_counts()
+    for value, count in merged.top(3):
+        # Misra-Gries undercounts by at most `error`
+        assert true_counts[value] - merged.error <= count <= true_counts[value]
+
+
+def test_sketches_round_trip_through_dicts(values):
+    hll, digest, top = HyperLogLog(), TDigest(), TopK()
+    hll.update(values)
+    digest.update(values.to_numpy())
+    top.update(values.round(-3))
+
+    assert HyperLogLog.from_dict(hll.to_dict()).estimate() == hll.estimate()
+    assert TDigest.from_dict(digest.to_dict()).quantile(0.5) == digest.quantile(0.5)
+    assert TopK.from_dict(top.to_dict()).top(5) == top.top(5)
+
+
+RAW_CHUNK = pd.DataFrame({
+    'Segment': ['Government', 'Midmarket', 'Government', 'Enterprise'],
+    'Sales': [' $32,370.00 ', ' $(4,533.75)', ' $-   ', ' $1,000.00 '],
+    'Date': ['01/12/2014', '13/01/2014', '01/06/2013', '2014-02-01'],
+}, dtype=str)
+
+
+def test_infer_kinds_detects_day_first_dates():
+    assert infer_kinds(RAW_CHUNK) == {'Segment': 'text', 'Sales': 'numeric', 'Date': 'date'}
+
+
+def test_date_min_max_are_chronological():
+    profile = profile_chunk(RAW_CHUNK, infer_kinds(RAW_CHUNK), ['Segment'])
+    date = profile.columns['Date'].summary()
+    # Lexically '01/06/2013'..'2014-02-01'; chronologically 1 June 2013..1 Dec 2014
+    assert (date['min'], date['max']) == ('2013-06-01', '2014-12-01')
+
+
+def test_values_that_fail_to_parse_are_counted_as_invalid():
+    kinds = infer_kinds(RAW_CHUNK)
+    later_chunk = pd.DataFrame({
+        'Segment': ['Government', 'Government'],
+        'Sales': ['n/a', ' $10.00 '],
+        'Date': ['31/02/2014', ''],
+    }, dtype=str)
+
+    normalised, invalid = normalise_chunk(later_chunk, kinds)
+    assert invalid == {'Segment': 0, 'Sales': 1, 'Date': 1}
+    assert normalised['Sales'].isna().tolist() == [True, False]
+
+    profile = profile_chunk(later_chunk, kinds, ['Segment'])
+    assert profile.columns['Date'].invalid == 1
+    assert profile.columns['Date'].nulls == 2
+
+
+def test_dataset_profiles_merge_like_a_single_pass():
+    kinds = infer_kinds(RAW_CHUNK)
+    single = profile_chunk(RAW_CHUNK, kinds, ['Segment'])
+    merged = profile_chunk(RAW_CHUNK.iloc[:2], kinds, ['Segment'])
+    merged.merge(profile_chunk(RAW_CHUNK.iloc[2:], kinds, ['Segment']))
+
+    assert merged.summary() == single.summary()
+    restored = DatasetProfile.from_dict(merged.to_dict())
+    assert restored.summary() == single.summary()
@@ -0,0 +1,142 @@
+"""
+Tests for the ingestion-time validator (validate_financials.py)
+Rows are written the way the raw export writes them: currency-formatted
+amounts and day-first dates.
+"""
+
+import pandas as pd
+import pytest
+
+from validate_financials import (
+    REASON_CODES, MISSING_VALUE, MISSING_PROFIT, NON_NUMERIC, GROSS_SALES_MISMATCH,
+    NET_SALES_MISMATCH, PROFIT_MISMATCH, UNKNOWN_DISCOUNT_BAND, DISCOUNT_BAND_MISMATCH,
+    INVALID_DATE, DATE_MISMATCH,
+    to_number, parse_dates, validate_chunk, split_chunk, validate_csv, quarantine_rate
+)
+
+# A valid row from Financials.csv (1 December 2014)
+VALID_ROW = {
+    'Segment': 'Government',
+    'Country': 'Canada',
+    'Product': ' Carretera ',
+    'Discount Band': ' None ',
+    'Units Sold': ' $1,618.50 ',
+    'Manufacturing Price': ' $3.00 ',
+    'Sale Price': ' $20.00 ',
+    'Gross Sales': ' $32,370.00 ',
+    'Discounts': ' $-   ',
+    'Sales': ' $32,370.00 ',
+    'COGS': ' $16,185.00 ',
+    'Profit': ' $16,185.00 ',
+    'Date': '01/12/2014',
+    'Month Number': '12',
+    'Month Name': ' December ',
+    'Year': '2014'
+}
+
+
+def make_chunk(*changes):
+    """A chunk with one VALID_ROW per entry in changes, each updated with that dict"""
+    return pd.DataFrame([{**VALID_ROW, **change} for change in changes], dtype=str)
+
+
+def failed_codes(failures, row=0):
+    return {code for code in REASON_CODES if failures.loc[row, code]}
+
+
+def test_valid_row_passes():
+    assert failed_codes(validate_chunk(make_chunk({}))) == set()
+
+
+@pytest.mark.parametrize('change, expected', [
+    ({'Segment': ''}, MISSING_VALUE),
+    ({'Profit': ''}, MISSING_PROFIT),
+    ({'COGS': 'abc'}, NON_NUMERIC),
+    ({'Sale Price': ' $21.00 '}, GROSS_SALES_MISMATCH),
+    ({'Sales': ' $32,000.00 ', 'Profit': ' $15,815.00 '}, NET_SALES_MISMATCH),
+    ({'Profit': ' $16,000.00 '}, PROFIT_MISMATCH),
+    ({'Discount Band': ' Huge '}, UNKNOWN_DISCOUNT_BAND),
+    ({'Discount Band': ' High '}, DISCOUNT_BAND_MISMATCH),
+    ({'Date': '31/02/2014'}, INVALID_DATE),
+    ({'Month Number': '11'}, DATE_MISMATCH),
+])
+def test_each_reason_code(change, expected):
+    assert failed_codes(validate_chunk(make_chunk(change))) == {expected}
+
+
+def test_amounts_within_a_cent_pass():
+    chunk = make_chunk({'Profit': ' $16,185.01 '})
+    assert failed_codes(validate_chunk(chunk)) == set()
+
+
+def test_discount_band_within_range_passes():
+    # 10% discount: Medium covers 5-10%
+    chunk = make_chunk({
+        'Discount Band': ' Medium ', 'Discounts': ' $3,237.00 ',
+        'Sales': ' $29,133.00 ', 'Profit': ' $12,948.00 '
+    })
+    assert failed_codes(validate_chunk(chunk)) == set()
+
+
+def test_to_number_parses_export_formats():
+    values = pd.Series([' $1,618.50 ', ' $-   ', ' $(4,533.75)', '', 'abc', '12'])
+    result = to_number(values)
+    assert result.iloc[:3].tolist() == [1618.5, 0.0, -4533.75]
+    assert result.iloc[3:5].isna().all()
+    assert result.iloc[5] == 12.0
+
+
+def test_dates_are_day_first_by_default():
+    dates = parse_dates(pd.Series(['01/12/2014', '13/01/2014']))
+    assert dates.dt.month.tolist() == [12, 1]
+    assert dates.dt.day.tolist() == [1, 13]
+
+
+def test_iso_dates_are_always_accepted():
+    dates = parse_dates(pd.Series(['2014-12-01', '01/12/2014', 'not a date']))
+    assert dates.iloc[0] == pd.Timestamp('2014-12-01')
+    assert dates.iloc[1] == pd.Timestamp('2014-12-01')
+    assert pd.isna(dates.iloc[2])
+
+
+def test_iso_row_validates():
+    assert failed_codes(validate_chunk(make_chunk({'Date': '2014-12-01'}))) == set()
+
+
+def test_month_first_format_reports_date_mismatch():
+    # 01/12/2014 read month first is 12 January, which disagrees with Month Number 12
+    failures = validate_chunk(make_chunk({}), date_format='%m/%d/%Y')
+    assert failed_codes(failures) == {DATE_MISMATCH}
+
+
+def test_split_chunk_quarantines_with_reason_codes():
+    chunk = make_chunk({}, {'Profit': ' $16,000.00 ', 'Month Number': '11'})
+    valid, quarantined, counts = split_chunk(chunk)
+    assert valid.index.tolist() == [0]
+    assert quarantined['reason_codes'].tolist() == [f'{PROFIT_MISMATCH};{DATE_MISMATCH}']
+    assert counts[PROFIT_MISMATCH] == 1 and counts[DATE_MISMATCH] == 1
+
+
+def test_allowed_reasons_are_counted_but_not_quarantined():
+    chunk = make_chunk({'Month Number': '11'})
+    valid, quarantined, counts = split_chunk(chunk, allowed_reasons=[DATE_MISMATCH])
+    assert len(valid) == 1 and quarantined.empty
+    assert counts[DATE_MISMATCH] == 1
+
+
+def test_validate_csv_streams_chunks(tmp_path):
+    path = tmp_path / 'financials.csv'
+    make_chunk({}, {}, {'Segment': ''}, {}).to_csv(path, index=False)
+    quarantined = []
+
+    totals = validate_csv(path, chunk_size=2,
+                          on_quarantine=lambda chunk_number, rows: quarantined.append(rows))
+
+    assert totals['rows'] == 4 and totals['valid'] == 3 and totals['quarantined'] == 1
+    assert totals['failures'] == {MISSING_VALUE: 1}
+    assert quarantined[0]['source_row'].tolist() == [4]
+    assert quarantine_rate(totals) == 0.25
+
+
+def test_quarantine_rate_of_empty_file_rejects_it():
+    assert quarantine_rate({'rows': 0, 'quarantined': 0}) == 1.0
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+"""
+Ingestion-time validation for the raw financial data
+This module checks every row of the source file against the arithmetic and
+calendar invariants of the dataset while it is being loaded, one chunk at a
+time, so bad rows are caught before they reach the warehouse.
+
+Rows that fail a check are written to raw.raw_financials_quarantine with the
+reason codes of every check they failed.
+"""
+
+import sys
+import logging
+import argparse
+import datetime
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('financial_validation')
+
+CHUNK_SIZE = 50000
+
+RAW_SCHEMA = 'raw'
+RAW_TABLE = 'raw_financials'
+QUARANTINE_TABLE = 'raw_financials_quarantine'
+
+# Amounts are rounded to cents in the source, so a derived amount can be off
+# by a cent or two; large amounts are also allowed a small relative error
+ABS_TOLERANCE = 0.02
+REL_TOLERANCE = 1e-6
+
+# Discount rate (Discounts / Gross Sales) allowed for each band
+DISCOUNT_BANDS = {
+    'None': (0.0, 0.0),
+    'Low': (0.0, 0.05),
+    'Medium': (0.05, 0.10),
+    'High': (0.10, 0.15),
+}
+DISCOUNT_RATE_TOLERANCE = 0.001
+
+# The raw export writes day-first dates (01/12/2014 is 1 December). ISO dates
+# (2014-12-01, as in financials_cleaned.csv) are unambiguous and always accepted.
+DEFAULT_DATE_FORMAT = '%d/%m/%Y'
+
+# A load is rejected when more than this share of its rows is quarantined,
+# since that points at a wrong file or date format rather than bad rows
+MAX_QUARANTINE_RATE = 0.05
+
+NUMERIC_COLUMNS = [
+    'Units Sold', 'Manufacturing Price', 'Sale Price', 'Gross Sales',
+    'Discounts', 'Sales', 'COGS', 'Profit', 'Month Number', 'Year'
+]
+REQUIRED_COLUMNS = [
+    'Segment', 'Country', 'Product', 'Discount Band', 'Units Sold',
+    'Sale Price', 'Gross Sales', 'Sales', 'COGS', 'Date'
+]
+
+# Reason codes, in the order they are reported
+MISSING_VALUE = 'MISSING_VALUE'
+MISSING_PROFIT = 'MISSING_PROFIT'
+NON_NUMERIC = 'NON_NUMERIC'
+GROSS_SALES_MISMATCH = 'GROSS_SALES_MISMATCH'
+NET_SALES_MISMATCH = 'NET_SALES_MISMATCH'
+PROFIT_MISMATCH = 'PROFIT_MISMATCH'
+UNKNOWN_DISCOUNT_BAND = 'UNKNOWN_DISCOUNT_BAND'
+DISCOUNT_BAND_MISMATCH = 'DISCOUNT_BAND_MISMATCH'
+INVALID_DATE = 'INVALID_DATE'
+DATE_MISMATCH = 'DATE_MISMATCH'
+
+REASON_CODES = [
+    MISSING_VALUE, MISSING_PROFIT, NON_NUMERIC, GROSS_SALES_MISMATCH,
+    NET_SALES_MISMATCH, PROFIT_MISMATCH, UNKNOWN_DISCOUNT_BAND,
+    DISCOUNT_BAND_MISMATCH, INVALID_DATE, DATE_MISMATCH
+]
+
+
+def to_number(series):
+    """
+    Convert a column to floats, accepting both the cleaned file (plain numbers)
+    and the original export (" $1,618.50 ", " $-   " for zero, " $(4,533.75)"
+    for negatives)
+    """
+    if series.dtype.kind in 'biuf':
+        return series.astype(float)
+
+    text = series.astype(str).str.replace(r'[\$,\s]', '', regex=True)
+    text = text.str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+    text = text.replace({'-': '0', '': np.nan, 'nan': np.nan, 'None': np.nan})
+    return pd.to_numeric(text, errors='coerce')
+
+
+def parse_dates(series, date_format=DEFAULT_DATE_FORMAT):
+    """
+    Parse the Date column with date_format, falling back to ISO (YYYY-MM-DD)
+    for values that do not match it. Unparseable values become NaT.
+    """
+    dates = pd.to_datetime(series, format=date_format, errors='coerce')
+    if date_format is not None:
+        iso = pd.to_datetime(series.where(dates.isna()), format='%Y-%m-%d', errors='coerce')
+        dates = dates.fillna(iso)
+    return dates
+
+
+def amounts_match(actual, expected):
+    """Vectorized comparison of two amount columns within tolerance"""
+    tolerance = np.maximum(ABS_TOLERANCE, REL_TOLERANCE * expected.abs())
+    return (actual - expected).abs() <= tolerance
+
+
+def validate_chunk(chunk, date_format=DEFAULT_DATE_FORMAT):
+    """
+    Check every invariant for a chunk of raw rows in a single vectorized pass
+    Returns a DataFrame of booleans with one column per reason code
+    (True means the row failed that check), indexed like the chunk
+    """
+    failures = pd.DataFrame(False, index=chunk.index, columns=REASON_CODES)
+
+    text = {
+        column: chunk[column].astype(str).str.strip()
+        for column in ['Segment', 'Country', 'Product', 'Discount Band', 'Month Name']
+    }
+
+    # Missing and non-numeric values. A blank discount means no discount.
+    raw_missing = chunk[REQUIRED_COLUMNS].isna() | chunk[REQUIRED_COLUMNS].astype(str).apply(
+        lambda column: column.str.strip().isin(['', 'nan'])
+    )
+    failures[MISSING_VALUE] = raw_missing.any(axis=1)
+
+    numbers = pd.DataFrame({column: to_number(chunk[column]) for column in NUMERIC_COLUMNS})
+    numbers['Discounts'] = numbers['Discounts'].fillna(0.0)
+    failures[MISSING_PROFIT] = numbers['Profit'].isna()
+
+    supplied = chunk[NUMERIC_COLUMNS].notna() & ~chunk[NUMERIC_COLUMNS].astype(str).apply(
+        lambda column: column.str.strip().isin(['', 'nan'])
+    )
+    failures[NON_NUMERIC] = (supplied & numbers.isna()).any(axis=1)
+
+    # Arithmetic invariants. Rows with missing inputs are already flagged
+    # above, so NaN comparisons are treated as passing here.
+    units = numbers['Units Sold']
+    gross = numbers['Gross Sales']
+    discounts = numbers['Discounts']
+    sales = numbers['Sales']
+
+    def mismatch(actual, expected):
+        known = actual.notna() & expected.notna()
+        return known & ~amounts_match(actual, expected)
+
+    failures[GROSS_SALES_MISMATCH] = mismatch(gross, units * numbers['Sale Price'])
+    failures[NET_SALES_MISMATCH] = mismatch(sales, gross - discounts)
+    failures[PROFIT_MISMATCH] = mismatch(numbers['Profit'], sales - numbers['COGS'])
+
+    # Discount band consistency
+    band = text['Discount Band']
+    known_band = band.isin(list(DISCOUNT_BANDS))
+    failures[UNKNOWN_DISCOUNT_BAND] = ~known_band & ~raw_missing['Discount Band']
+
+    rate = discounts / gross.where(gross != 0)
+    low = band.map({name: bounds[0] for name, bounds in DISCOUNT_BANDS.items()})
+    high = band.map({name: bounds[1] for name, bounds in DISCOUNT_BANDS.items()})
+    out_of_band = (
+        (rate < low - DISCOUNT_RATE_TOLERANCE) | (rate > high + DISCOUNT_RATE_TOLERANCE)
+    )
+    failures[DISCOUNT_BAND_MISMATCH] = known_band & rate.notna() & out_of_band
+
+    # Date / Month Number / Month Name / Year agreement
+    dates = parse_dates(chunk['Date'].astype(str).str.strip(), date_format)
+    failures[INVALID_DATE] = dates.isna() & ~raw_missing['Date']
+    failures[DATE_MISMATCH] = dates.notna() & (
+        (dates.dt.month != numbers['Month Number'])
+        | (dates.dt.year != numbers['Year'])
+        | (dates.dt.month_name() != text['Month Name'])
+    )
+
+    return failures
+
+
+def reason_codes(failures):
+    """Collapse the failure flags into a ';'-separated reason code string per row"""
+    labels = pd.Series([code + ';' for code in failures.columns], index=failures.columns)
+    return failures.dot(labels).str.rstrip(';')
+
+
+def split_chunk(chunk, date_format=DEFAULT_DATE_FORMAT, allowed_reasons=()):
+    """
+    Validate a chunk and split it into rows to load and rows to quarantine
+    Column names are expected without padding, e.g. 'Product' not ' Product '
+    Failures listed in allowed_reasons are counted but do not quarantine a row
+    Returns (valid_rows, quarantined_rows, failure_counts)
+    """
+    failures = validate_chunk(chunk, date_format)
+    blocking = failures.drop(columns=list(allowed_reasons))
+    quarantine_mask = blocking.any(axis=1)
+
+    quarantined = chunk.loc[quarantine_mask].copy()
+    quarantined['reason_codes'] = reason_codes(failures.loc[quarantine_mask])
+
+    return chunk.loc[~quarantine_mask], quarantined, failures.sum()
+
+
+def validate_csv(csv_path, chunk_size=CHUNK_SIZE, date_format=DEFAULT_DATE_FORMAT, allowed_reasons=(),
+                 on_valid=None, on_quarantine=None):
+    """
+    Stream a CSV through the validator one chunk at a time
+    on_valid / on_quarantine are called with each chunk's rows, e.g. to load
+    them into the database; quarantined rows carry source_row and reason_codes
+    Returns a dict with row totals and failure counts per reason code
+    """
+    totals = {'rows': 0, 'valid': 0, 'quarantined': 0}
+    failure_counts = pd.Series(0, index=REASON_CODES)
+
+    for chunk_number, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_size, dtype=str)):
+        # The original export pads its headers with spaces (" Product ")
+        chunk = chunk.rename(columns=lambda column: column.strip())
+        valid, quarantined, counts = split_chunk(chunk, date_format, allowed_reasons)
+        quarantined.insert(0, 'source_row', quarantined.index + 2)  # 1-based, after the header
+
+        totals['rows'] += len(chunk)
+        totals['valid'] += len(valid)
+        totals['quarantined'] += len(quarantined)
+        failure_counts += counts
+
+        if on_valid is not None and not valid.empty:
+            on_valid(chunk_number, valid)
+        if on_quarantine is not None and not quarantined.empty:
+            on_quarantine(chunk_number, quarantined)
+
+    totals['failures'] = {code: int(count) for code, count in failure_counts.items() if count}
+    return totals
+
+
+def quarantine_writer(con, source_file, schema=RAW_SCHEMA, table=QUARANTINE_TABLE):
+    """
+    Return an on_quarantine callback that appends rows to the quarantine table
+    tagged with the source file and load time
+    con is a SQLAlchemy engine or connection
+    """
+    quarantined_at = datetime.datetime.now()
+
+    def write(chunk_number, rows):
+        rows['source_file'] = source_file
+        rows['quarantined_at'] = quarantined_at
+        rows.to_sql(table, con, schema=schema, if_exists='append', index=False)
+
+    return write
+
+
+def quarantine_rate(totals):
+    """Share of the validated rows that were quarantined (1.0 for an empty file)"""
+    if not totals['rows']:
+        return 1.0
+    return totals['quarantined'] / totals['rows']
+
+
+def log_summary(totals):
+    """Log the outcome of a validation run"""
+    logger.info(
+        f"Validated {totals['rows']} rows: {totals['valid']} valid, "
+        f"{totals['quarantined']} quarantined"
+    )
+    for code, count in totals['failures'].items():
+        logger.info(f"  {code}: {count} rows")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    parser = argparse.ArgumentParser(description="Validate a raw financials CSV without loading it")
+    parser.add_argument("csv_path", help="CSV file to validate")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows validated per chunk")
+    parser.add_argument("--date-format", default=DEFAULT_DATE_FORMAT,
+                        help="strptime format of the Date column (default: %(default)s)")
+    parser.add_argument("--allow", action="append", default=[], choices=REASON_CODES,
+                        help="Reason code to report without quarantining (repeatable)")
+    parser.add_argument("--quarantine-csv", help="Write quarantined rows to this CSV file")
+
+    args = parser.parse_args()
+
+    on_quarantine = None
+    if args.quarantine_csv:
+        written = []
+
+        def on_quarantine(chunk_number, rows):
+            rows.to_csv(args.quarantine_csv, mode='a' if written else 'w',
+                        header=not written, index=False)
+            written.append(chunk_number)
+
+    totals = validate_csv(args.csv_path, args.chunk_size, args.date_format, args.allow,
+                          on_quarantine=on_quarantine)
+    log_summary(totals)
+    sys.exit(0 if totals['quarantined'] == 0 else 1)